@@ -8,22 +8,25 @@ Kod skriven med hjälp av Claude Code, Grok och Cursor.
 
 import datetime
 import logging
+import multiprocessing
 import sys
 from pathlib import Path
 
+# Directory containing this script, resolved once at import
+SCRIPT_DIR = Path(__file__).resolve().parent
+
 # Add src directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+sys.path.insert(0, str(SCRIPT_DIR / "src"))
 
 from src.gui.main_window import CombinedApp
 from src.singleton import SingleInstance
 
 def setup_logging():
     """Setup logging to file in date-based subdirectories"""
-    script_dir = Path(__file__).parent
     now = datetime.datetime.now()
     
     # Create logs directory with year-month subdirectory
-    log_dir = script_dir / "logs" / now.strftime('%Y-%m')
+    log_dir = SCRIPT_DIR / "logs" / now.strftime('%Y-%m')
     log_dir.mkdir(parents=True, exist_ok=True)
     
     log_filename = log_dir / f"djs_kb_maskin_{now.strftime('%Y%m%d_%H%M%S')}.log"
@@ -31,7 +34,7 @@ def setup_logging():
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler(log_filename, encoding='utf-8'),
+            logging.FileHandler(log_filename, encoding='utf-8', delay=True),
             logging.StreamHandler()
         ]
     )
@@ -66,4 +69,6 @@ def main():
         single_instance.release_mutex()
 
 if __name__ == "__main__":
+    # Required for the PDF worker processes in the frozen Windows executable
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -6,39 +6,104 @@ Configuration management for the DJs app
 import json
 import logging
 import os
-import subprocess
 import sys
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from .version import get_version
+except ImportError:
+    from version import get_version
+
+if ORJSON_AVAILABLE:
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj, indent=2).encode("utf-8")
+
 logger = logging.getLogger(__name__)
 
+# The user's home directory, resolved once (Path.home() consults the environment/pwd on every call)
+_HOME_DIR = Path.home()
+
+# Last content written by save_config, used to skip writes when nothing changed
+_last_serialized = None
+
+# Whether the config directory has been created/verified during this process
+_config_dir_ready = False
+
+@lru_cache(maxsize=1)
 def get_app_directory():
     """
     Get the directory where the application is located (works for both .py and .exe)
     
+    The location cannot change while the process runs, so it is resolved once.
+    
     Returns:
         Path: Absolute path to the application directory
     """
     if getattr(sys, 'frozen', False):
         # Running as PyInstaller executable
         app_dir = Path(sys.executable).parent
-        logger.debug(f"Running as executable - app directory: {app_dir}")
+        logger.debug("Running as executable - app directory: %s", app_dir)
     else:
         # Running as Python script - go up 2 levels from src/config.py
         app_dir = Path(__file__).parent.parent
-        logger.debug(f"Running as script - app directory: {app_dir}")
+        logger.debug("Running as script - app directory: %s", app_dir)
     
     # Ensure it's absolute
     app_dir = app_dir.resolve()
-    logger.debug(f"Resolved app directory: {app_dir}")
-    logger.debug(f"Current working directory: {Path.cwd()}")
+    logger.debug("Resolved app directory: %s", app_dir)
+    logger.debug("Current working directory: %s", Path.cwd())
     
     return app_dir
 
+def _read_xdg_download_dir():
+    """
+    Read XDG_DOWNLOAD_DIR from user-dirs.dirs - the same file the xdg-user-dir
+    tool reads, without spawning a process
+    
+    Returns:
+        Path or None: The configured Downloads folder, or None if not set
+    """
+    config_home = os.environ.get("XDG_CONFIG_HOME") or str(_HOME_DIR / ".config")
+    try:
+        with open(Path(config_home) / "user-dirs.dirs", encoding="utf-8") as f:
+            for line in f:
+                if not line.startswith("XDG_DOWNLOAD_DIR="):
+                    continue
+                value = line.split("=", 1)[1].strip().strip('"')
+                # Values are either absolute or relative to $HOME
+                if value.startswith("$HOME"):
+                    value = str(_HOME_DIR) + value[len("$HOME"):]
+                elif not value.startswith("/"):
+                    return None
+                downloads_folder = Path(value)
+                # A Downloads entry pointing at $HOME itself means "disabled"
+                return None if downloads_folder == _HOME_DIR else downloads_folder
+    except OSError:
+        pass
+    return None
+
+@lru_cache(maxsize=1)
 def get_user_downloads_folder():
     """
     Get the user's Downloads folder with cross-platform support and fallbacks
     
+    Detected once per process - the registry/XDG lookup is not repeated.
+    
     Returns:
         Path: Absolute path to the user's Downloads folder, or fallback location
     """
@@ -55,54 +120,49 @@ def get_user_downloads_folder():
                     downloads_path = winreg.QueryValueEx(key, "{374DE290-123F-4565-9164-39C4925E467B}")[0]
                     downloads_folder = Path(downloads_path)
                     if downloads_folder.exists():
-                        logger.info(f"Windows Downloads folder found via registry: {downloads_folder}")
+                        logger.info("Windows Downloads folder found via registry: %s", downloads_folder)
                         return downloads_folder
             except (ImportError, OSError, FileNotFoundError):
                 logger.debug("Registry method failed, trying fallback")
             
             # Windows fallback: Standard Downloads folder
-            downloads_folder = Path.home() / "Downloads"
+            downloads_folder = _HOME_DIR / "Downloads"
             if downloads_folder.exists():
-                logger.info(f"Windows Downloads folder found via fallback: {downloads_folder}")
+                logger.info("Windows Downloads folder found via fallback: %s", downloads_folder)
                 return downloads_folder
                 
         elif sys.platform == 'darwin':
             # macOS: Standard Downloads folder
-            downloads_folder = Path.home() / "Downloads"
+            downloads_folder = _HOME_DIR / "Downloads"
             if downloads_folder.exists():
-                logger.info(f"macOS Downloads folder found: {downloads_folder}")
+                logger.info("macOS Downloads folder found: %s", downloads_folder)
                 return downloads_folder
                 
         else:
             # Linux/Unix: Try XDG user-dirs first
-            try:
-                result = subprocess.run(['xdg-user-dir', 'DOWNLOAD'], 
-                                       capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    downloads_path = result.stdout.strip()
-                    downloads_folder = Path(downloads_path)
-                    if downloads_folder.exists():
-                        logger.info(f"Linux Downloads folder found via XDG: {downloads_folder}")
-                        return downloads_folder
-            except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
-                logger.debug("XDG user-dirs method failed, trying fallback")
+            downloads_folder = _read_xdg_download_dir()
+            if downloads_folder is not None and downloads_folder.exists():
+                logger.info("Linux Downloads folder found via XDG: %s", downloads_folder)
+                return downloads_folder
+            logger.debug("XDG user-dirs method failed, trying fallback")
             
             # Linux fallback: Standard Downloads folder
-            downloads_folder = Path.home() / "Downloads"
+            downloads_folder = _HOME_DIR / "Downloads"
             if downloads_folder.exists():
-                logger.info(f"Linux Downloads folder found via fallback: {downloads_folder}")
+                logger.info("Linux Downloads folder found via fallback: %s", downloads_folder)
                 return downloads_folder
                 
     except Exception as e:
-        logger.warning(f"Error detecting Downloads folder: {e}")
+        logger.warning("Error detecting Downloads folder: %s", e)
     
     # Ultimate fallback: Create "Svenska tidningar" in app directory
     app_dir = get_app_directory()
     fallback_folder = app_dir / "Svenska tidningar"
-    logger.warning(f"Could not find user Downloads folder, using app directory fallback: {fallback_folder}")
+    logger.warning("Could not find user Downloads folder, using app directory fallback: %s", fallback_folder)
     return fallback_folder
 
 # Use absolute path for config file in app directory
+@lru_cache(maxsize=1)
 def get_config_file_path():
     r"""
     Get the absolute path to the configuration file using platform-specific directory.
@@ -110,6 +170,8 @@ def get_config_file_path():
     Windows: %APPDATA%\DJs KB-maskin\djs_kb-maskin_settings.json
     Linux/macOS: ~/.djs_kb_maskin/djs_kb-maskin_settings.json
 
+    Computed once per process.
+
     Returns:
         Path: Absolute path to configuration file
     """
@@ -121,23 +183,28 @@ def get_config_file_path():
         base_dir = Path(appdata) / "DJs KB-maskin"
     else:
         # Linux/macOS: Use hidden folder in home directory
-        base_dir = Path.home() / ".djs_kb_maskin"
+        base_dir = _HOME_DIR / ".djs_kb_maskin"
 
     config_path = base_dir / "djs_kb-maskin_settings.json"
-    logger.info(f"Config file path: {config_path}")
+    logger.info("Config file path: %s", config_path)
     return config_path
 
 def ensure_config_directory_exists():
     """
     Ensure the configuration directory exists.
     Creates the directory if it doesn't exist, including parent directories.
+    Only done once per process; save_config resets the flag if a write fails.
     """
+    global _config_dir_ready
+    if _config_dir_ready:
+        return
     config_file = get_config_file_path()
     try:
         config_file.parent.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Config directory ensured: {config_file.parent}")
+        _config_dir_ready = True
+        logger.info("Config directory ensured: %s", config_file.parent)
     except Exception as e:
-        logger.error(f"Failed to create config directory: {e}")
+        logger.error("Failed to create config directory: %s", e)
 
 def migrate_config_if_needed():
     """
@@ -156,32 +223,29 @@ def migrate_config_if_needed():
     # Look for old config in app directory
     old_config_path = get_app_directory() / "djs_kb-maskin_settings.json"
 
-    if old_config_path.exists() and old_config_path.is_file():
+    # is_file() is False for a missing path too - one stat instead of two
+    if old_config_path.is_file():
         try:
             import shutil
 
             # Copy old config to new location (safer than move)
             shutil.copy2(old_config_path, new_config_path)
-            logger.info(f"Migrated config from {old_config_path} to {new_config_path}")
+            logger.info("Migrated config from %s to %s", old_config_path, new_config_path)
 
             # Rename old file as backup
             backup_path = old_config_path.with_suffix('.json.old')
             old_config_path.rename(backup_path)
-            logger.info(f"Renamed old config to {backup_path}")
+            logger.info("Renamed old config to %s", backup_path)
 
         except Exception as e:
-            logger.warning(f"Failed to migrate old config file: {e}")
+            logger.warning("Failed to migrate old config file: %s", e)
             logger.warning("Application will continue with default configuration")
     else:
         logger.debug("No old config file found - fresh installation")
 
+
 def load_config():
     """Load application configuration"""
-    try:
-        from .version import get_version
-    except ImportError:
-        from version import get_version
-
     # Ensure config directory exists and migrate old config if needed
     ensure_config_directory_exists()
     migrate_config_if_needed()
@@ -193,9 +257,9 @@ def load_config():
     user_downloads = get_user_downloads_folder()
     default_download_dir = user_downloads / "Svenska tidningar"
     
-    logger.info(f"Loading configuration from user Downloads: {user_downloads}")
-    logger.info(f"Default download directory: {default_download_dir}")
-    logger.info(f"Current application version: {current_version}")
+    logger.info("Loading configuration from user Downloads: %s", user_downloads)
+    logger.info("Default download directory: %s", default_download_dir)
+    logger.info("Current application version: %s", current_version)
     
     default_config = {
         "_config_version": current_version,  # Track which version created this config
@@ -210,6 +274,8 @@ def load_config():
         "kb_output_dir": "",
         "keep_renamed": False,
         "use_alias": True,
+        # [width, height] in pixels to reduce PDF pages to while decoding; null keeps full resolution
+        "pdf_max_page_size": None,
         "update_settings": {
             "github_repo_owner": "Tripper99",  # TODO: Replace with actual GitHub username
             "github_repo_name": "DJs-KB-maskin",
@@ -222,80 +288,86 @@ def load_config():
     }
     
     config_file = get_config_file_path()
-    logger.debug(f"Looking for config file at: {config_file}")
+    logger.debug("Looking for config file at: %s", config_file)
     
-    if config_file.exists():
-        try:
-            logger.info(f"Loading existing configuration from: {config_file}")
-            with open(config_file, "r", encoding="utf-8") as f:
-                config = json.load(f)
-                
-                # Check if configuration is from an older version
-                config_version = config.get("_config_version", "unknown")
-                if config_version != current_version:
-                    logger.info(f"Configuration file is from version {config_version}, current version is {current_version}")
-                    logger.info("Using default configuration to ensure compatibility with new version")
-                    return default_config
-                
-                # Version matches, merge with defaults
-                config = _deep_merge_config(default_config, config)
-                logger.debug("Configuration loaded successfully")
-                return config
-        except (json.JSONDecodeError, IOError) as e:
-            logger.warning(f"Error reading config file: {e}, using defaults")
-            return default_config
-    else:
+    # Open directly rather than stat first - a missing file raises FileNotFoundError
+    try:
+        config = _loads(config_file.read_bytes())
+    except FileNotFoundError:
         logger.info("No existing configuration found, using defaults")
-    
-    return default_config
+        return default_config
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning("Error reading config file: %s, using defaults", e)
+        return default_config
+    logger.info("Loaded existing configuration from: %s", config_file)
+
+    # Check if configuration is from an older version
+    config_version = config.get("_config_version", "unknown")
+    if config_version != current_version:
+        logger.info("Configuration file is from version %s, current version is %s", config_version, current_version)
+        logger.info("Using default configuration to ensure compatibility with new version")
+        return default_config
+
+    # Version matches, merge with defaults
+    config = _deep_merge_config(default_config, config)
+    logger.debug("Configuration loaded successfully")
+    return config
 
 
 def _deep_merge_config(default_config, user_config):
     """
     Deep merge user configuration with defaults, ensuring all nested keys exist
     
+    Missing keys are filled into user_config in place - it is freshly parsed from
+    disk - so nothing is copied when the saved config already has every key.
+    
     Args:
         default_config: Default configuration dictionary
-        user_config: User's existing configuration dictionary
+        user_config: User's existing configuration dictionary (updated in place)
         
     Returns:
         Merged configuration with all default values preserved
     """
-    result = user_config.copy()
-    
     for key, default_value in default_config.items():
-        if key not in result:
+        if key not in user_config:
             # Key missing entirely, add default value
-            result[key] = default_value
-        elif isinstance(default_value, dict) and isinstance(result[key], dict):
+            user_config[key] = default_value
+        elif isinstance(default_value, dict) and isinstance(user_config[key], dict):
             # Both are dictionaries, recursively merge
-            result[key] = _deep_merge_config(default_value, result[key])
+            _deep_merge_config(default_value, user_config[key])
         # If key exists and is not a dict, keep user's value
     
-    return result
+    return user_config
 
 def save_config(config):
     """Save application configuration"""
-    try:
-        from .version import get_version
-    except ImportError:
-        from version import get_version
-    
     config_file = get_config_file_path()
-    logger.debug(f"Saving configuration to: {config_file}")
+    logger.debug("Saving configuration to: %s", config_file)
 
+    global _last_serialized, _config_dir_ready
     try:
+        # Always update config version when saving
+        config["_config_version"] = get_version()
+
+        serialized = _dumps(config)
+        if serialized == _last_serialized:
+            logger.debug("Configuration unchanged - skipping write")
+            return
+
         # Ensure the config directory exists (uses platform-specific path)
         ensure_config_directory_exists()
 
-        # Always update config version when saving
-        config["_config_version"] = get_version()
-        
-        with open(config_file, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2)
+        # Write to a temporary file and swap it in so a crash never leaves a truncated config
+        tmp_file = config_file.with_suffix('.tmp')
+        tmp_file.write_bytes(serialized)
+        tmp_file.replace(config_file)
+
+        _last_serialized = serialized
         logger.debug("Configuration saved successfully")
-    except IOError as e:
-        logger.error(f"Could not save configuration to {config_file}: {e}")
+    except (IOError, TypeError) as e:
+        # The directory may have been removed - check it again on the next save
+        _config_dir_ready = False
+        logger.error("Could not save configuration to %s: %s", config_file, e)
 
 
 def get_update_settings(config):
@@ -343,7 +415,6 @@ def should_check_for_updates(config):
     if not last_check:
         return True
         
-    from datetime import datetime, timedelta
     try:
         last_check_date = datetime.fromisoformat(last_check)
         check_interval = update_settings.get("check_interval_days", 7)
@@ -357,5 +428,4 @@ def should_check_for_updates(config):
 
 def update_last_check_date(config):
     """Update the last check date to current time"""
-    from datetime import datetime
     set_update_setting(config, "last_check_date", datetime.now().isoformat())
\ No newline at end of file
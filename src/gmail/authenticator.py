@@ -7,7 +7,7 @@ import json
 import logging
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 try:
     from google.auth.transport.requests import Request
@@ -19,10 +19,25 @@ try:
 except ImportError:
     GMAIL_AVAILABLE = False
 
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Project root, where the per-account token files are stored
+SCRIPT_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Characters not allowed in the per-account token filename
+_SAFE_EMAIL_RE = re.compile(r'[^\w\-_.]')
+
+# Live credentials and last written token JSON, keyed by (credentials_file, gmail_account)
+_CRED_CACHE: Dict[Tuple[str, str], 'Credentials'] = {}
+_TOKEN_JSON_CACHE: Dict[Tuple[str, str], str] = {}
+
 class AuthenticationError(Exception):
     pass
 
@@ -31,22 +46,21 @@ class GmailAuthenticator:
         self.credentials_file = Path(credentials_file) if credentials_file else None
         self.gmail_account = gmail_account
         self.token_file = self._generate_token_file_path()
+        self.credentials = None
         self.service = None
     
     def _generate_token_file_path(self) -> Optional[Path]:
         if not self.gmail_account:
             return None
-        safe_email = re.sub(r'[^\w\-_.]', '_', self.gmail_account)
-        script_dir = Path(__file__).parent.parent.parent
-        return script_dir / f'token_{safe_email}.json'
+        safe_email = _SAFE_EMAIL_RE.sub('_', self.gmail_account)
+        return SCRIPT_DIR / f'token_{safe_email}.json'
     
     def validate_credentials_file(self) -> bool:
         if not self.credentials_file or not self.credentials_file.exists():
             return False
         try:
-            with open(self.credentials_file, 'r') as f:
-                data = json.load(f)
-                return 'installed' in data or 'web' in data
+            data = _loads(self.credentials_file.read_bytes())
+            return 'installed' in data or 'web' in data
         except (json.JSONDecodeError, Exception):
             return False
     
@@ -62,8 +76,9 @@ class GmailAuthenticator:
             if gui_update_callback:
                 gui_update_callback()
             
-            creds = None
-            if self.token_file and self.token_file.exists():
+            cache_key = (str(self.credentials_file), self.gmail_account)
+            creds = _CRED_CACHE.get(cache_key)
+            if creds is None and self.token_file and self.token_file.exists():
                 creds = Credentials.from_authorized_user_file(str(self.token_file), SCOPES)
             
             if not creds or not creds.valid:
@@ -79,18 +94,32 @@ class GmailAuthenticator:
                     flow = InstalledAppFlow.from_client_secrets_file(str(self.credentials_file), SCOPES)
                     creds = flow.run_local_server(port=0)
             
+            _CRED_CACHE[cache_key] = creds
             if self.token_file:
-                with open(self.token_file, 'w') as token:
-                    token.write(creds.to_json())
+                token_json = creds.to_json()
+                if token_json != _TOKEN_JSON_CACHE.get(cache_key):
+                    with open(self.token_file, 'w') as token:
+                        token.write(token_json)
+                    _TOKEN_JSON_CACHE[cache_key] = token_json
             
             if progress_callback:
                 progress_callback("Gmail-autentisering slutförd!", 100)
             
-            self.service = build('gmail', 'v1', credentials=creds)
+            self.credentials = creds
+            self.service = self.build_service()
             
         except Exception as e:
             raise AuthenticationError(f"Autentiseringsfel: {str(e)}")
     
+    def build_service(self):
+        """Build a new Gmail service from the cached credentials.
+
+        httplib2.Http is not thread-safe, so each worker thread needs its own service.
+        """
+        if not self.credentials:
+            raise AuthenticationError("Not authenticated. Call authenticate() first.")
+        return build('gmail', 'v1', credentials=self.credentials)
+    
     def get_service(self):
         if not self.service:
             raise AuthenticationError("Not authenticated. Call authenticate() first.")
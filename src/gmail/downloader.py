@@ -4,17 +4,39 @@ Gmail download manager and orchestrator
 """
 
 import logging
+import os
+import shutil
+import threading
+import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Dict, Optional, Tuple, Union
 
 from .authenticator import GmailAuthenticator, AuthenticationError
-from .searcher import GmailSearcher
-from .processor import AttachmentProcessor
+from .searcher import GmailSearcher, shard_date_range
+from .processor import AttachmentProcessor, MAX_BATCH_SIZE, WRITE_CHUNK_SIZE
 from ..security import get_secure_ops, get_default_validator
 
 logger = logging.getLogger(__name__)
 
+# Gmail calls are latency-bound, so overlap round-trips across a small pool of workers
+MAX_DOWNLOAD_WORKERS = 12
+
+# Long date ranges are searched as parallel weekly sub-queries instead of one paginated scan
+SEARCH_SHARD_DAYS = 7
+MAX_SEARCH_WORKERS = 8  # Stay well under Gmail's per-user concurrency limits
+
+# Flags for creating attachment files; O_BINARY only exists (and matters) on Windows
+_OPEN_FLAGS = (os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+               | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0))
+
+# Same, but fails with FileExistsError instead of truncating an existing file
+_EXCL_FLAGS = (_OPEN_FLAGS & ~os.O_TRUNC) | os.O_EXCL
+
+# Minimum seconds between progress updates from the download loop (~10 Hz)
+UI_UPDATE_INTERVAL = 0.1
+
 class DownloadManager:
     def __init__(self, output_dir: str):
         self.secure_ops = get_secure_ops()
@@ -39,6 +61,7 @@ class DownloadManager:
         self.overwrite_all = False
         self.skip_all = False
         self.cancel_event = None
+        self.icon_callback = None  # Callback to set window icon on conflict dialogs
         # Track files downloaded in current session to avoid duplicates
         self.downloaded_in_session = set()
     
@@ -46,6 +69,22 @@ class DownloadManager:
         """Check if file was already downloaded in current session"""
         return filename in self.downloaded_in_session
     
+    def create_exclusive(self, filename: str) -> Optional[int]:
+        """
+        Create the target file only if it does not exist yet
+        
+        One open() call replaces an exists() check plus a later create in the
+        common no-conflict case.
+        
+        Returns:
+            An open file descriptor for the new file, or None if the file already exists
+        """
+        output_path = self.output_path / self.validator.sanitize_filename(filename)
+        try:
+            return os.open(output_path, _EXCL_FLAGS, 0o644)
+        except FileExistsError:
+            return None
+    
     def handle_filename_conflict(self, original_filename: str, root: tk.Tk) -> Optional[str]:
         file_path = self.output_path / original_filename
         if not file_path.exists():
@@ -182,40 +221,73 @@ class DownloadManager:
             logger.info(f"Download cancelled by user for file: {original_filename}")
             return None  # None means cancel entire operation
     
-    def save_file(self, filename: str, file_data: bytes) -> bool:
+    def save_file(self, filename: str, file_data: Union[bytes, BinaryIO]) -> bool:
+        if not isinstance(file_data, (bytes, bytearray, memoryview)):
+            # File-like input is copied in 1 MiB chunks instead of being read into memory
+            def copy_stream(dest):
+                shutil.copyfileobj(file_data, dest, WRITE_CHUNK_SIZE)
+                return dest.tell()
+            return self.save_attachment(filename, copy_stream) is not None
+        
+        # Bytes are handed to the file in a single write without an intermediate copy
+        def write_bytes(dest):
+            dest.write(memoryview(file_data))
+            return len(file_data)
+        return self.save_attachment(filename, write_bytes, size_hint=len(file_data)) is not None
+    
+    def save_attachment(self, filename: str, write_func, size_hint: Optional[int] = None,
+                        fd: Optional[int] = None) -> Optional[int]:
+        """
+        Stream an attachment into the output directory without holding it in memory
+        
+        Args:
+            filename: Desired filename (will be sanitized)
+            write_func: Callable that writes the content to a binary file object and
+                returns the number of bytes written, or None on failure/cancellation
+            size_hint: Expected size in bytes, used to preallocate the file where supported
+            fd: Descriptor from create_exclusive(); the file is then written in place
+            
+        Returns:
+            Number of bytes written, or None if nothing was saved
+        """
+        output_path = self.output_path / self.validator.sanitize_filename(filename)
+        if fd is None:
+            # Write to a partial file so a failed download never clobbers an existing file
+            target_path = output_path.with_name(output_path.name + ".part")
+        else:
+            # The file was created by us, so it can be written (and removed) directly
+            target_path = output_path
+        file_size = None
         try:
             logger.info(f"Saving file: '{filename}' to directory: '{self.output_path}'")
-            logger.debug(f"File size: {len(file_data)} bytes")
-            logger.debug(f"Output directory exists: {self.output_path.exists()}")
-            logger.debug(f"Output directory is writable: {self.output_path.is_dir() and self.output_path.exists()}")
-            
-            # Use secure file operations
-            output_path = self.secure_ops.save_file(
-                content=file_data,
-                filename=filename,
-                output_dir=str(self.output_path),
-                binary=True
-            )
-            file_size = len(file_data)
-            
-            logger.info(f"File saved successfully at: {output_path}")
-            logger.debug(f"Saved file exists: {Path(output_path).exists() if output_path else 'No path returned'}")
-            
-            # Verify the file was actually written
-            if output_path and Path(output_path).exists():
-                actual_size = Path(output_path).stat().st_size
-                logger.debug(f"Written file size: {actual_size} bytes (expected: {file_size})")
-                if actual_size != file_size:
-                    logger.warning(f"File size mismatch! Expected: {file_size}, Actual: {actual_size}")
-            else:
-                logger.error(f"File was not found after saving: {output_path}")
-            # Add to session tracking set (use sanitized filename)
-            self.downloaded_in_session.add(output_path.name)
-            logger.info(f"✅ Downloaded: {output_path.name} ({self.format_file_size(file_size)})")
-            return True
+            if fd is None:
+                fd = os.open(target_path, _OPEN_FLAGS, 0o644)
+            with os.fdopen(fd, 'wb') as f:
+                if size_hint and hasattr(os, 'posix_fallocate'):
+                    try:
+                        # Reserve the space up front to keep the file contiguous
+                        os.posix_fallocate(fd, 0, size_hint)
+                    except OSError:
+                        pass
+                file_size = write_func(f)
+                if size_hint and file_size is not None and file_size != size_hint:
+                    f.truncate(file_size)
+            if file_size is not None and target_path != output_path:
+                target_path.replace(output_path)
         except Exception as e:
             logger.error(f"Failed to save file {filename}: {e}")
-            return False
+            file_size = None
+        finally:
+            if file_size is None:
+                target_path.unlink(missing_ok=True)
+        
+        if file_size is None:
+            return None
+        
+        # Add to session tracking set (use sanitized filename)
+        self.downloaded_in_session.add(output_path.name)
+        logger.info(f"✅ Downloaded: {output_path.name} ({self.format_file_size(file_size)})")
+        return file_size
     
     @staticmethod
     def format_file_size(size_bytes: int) -> str:
@@ -241,6 +313,13 @@ class GmailDownloader:
         self.icon_callback = None  # Callback to set window icon
         self.secure_ops = get_secure_ops()
         self.validator = get_default_validator()
+        # Per-thread Gmail services (httplib2 is not thread-safe)
+        self._thread_local = threading.local()
+        # Serializes duplicate checks, conflict dialogs and saves across workers
+        self._save_lock = threading.Lock()
+        # Time of the last throttled progress update, guarded by _ui_lock
+        self._last_ui_ts = 0.0
+        self._ui_lock = threading.Lock()
     
     def set_root(self, root: tk.Tk):
         """Set the root window for dialog purposes"""
@@ -274,27 +353,143 @@ class GmailDownloader:
         service = self.authenticator.get_service()
         self.searcher = GmailSearcher(service)
         self.attachment_processor = AttachmentProcessor(service)
+        self._thread_local = threading.local()
+    
+    def _get_attachment_processor(self) -> AttachmentProcessor:
+        """Get an AttachmentProcessor with a Gmail service owned by the current thread"""
+        processor = getattr(self._thread_local, 'attachment_processor', None)
+        if processor is None:
+            processor = AttachmentProcessor(self.authenticator.build_service())
+            self._thread_local.attachment_processor = processor
+        return processor
+    
+    def _tick(self, message: str, progress: int, progress_callback=None,
+              gui_update_callback=None, force: bool = False):
+        """Report progress at most every UI_UPDATE_INTERVAL seconds, unless forced or complete"""
+        now = time.monotonic()
+        with self._ui_lock:
+            if not force and progress < 100 and now - self._last_ui_ts < UI_UPDATE_INTERVAL:
+                return
+            self._last_ui_ts = now
+        if progress_callback:
+            progress_callback(message, progress)
+        if gui_update_callback:
+            gui_update_callback()
+    
+    def _get_searcher(self) -> GmailSearcher:
+        """Get a GmailSearcher with a Gmail service owned by the current thread"""
+        searcher = getattr(self._thread_local, 'searcher', None)
+        if searcher is None:
+            searcher = GmailSearcher(self.authenticator.build_service())
+            self._thread_local.searcher = searcher
+        return searcher
+    
+    def _search_message_ids(self, sender_email: str, start_date: str, end_date: str,
+                            progress_callback=None, gui_update_callback=None) -> list:
+        """Search for matching message IDs, sharding long date ranges into parallel sub-queries"""
+        windows = []
+        if start_date and end_date and end_date != start_date:
+            windows = shard_date_range(start_date, end_date, SEARCH_SHARD_DAYS)
+        
+        if len(windows) <= 1:
+            query = self.searcher.build_search_query(sender_email, start_date, end_date)
+            return self.searcher.search_emails(query, progress_callback, gui_update_callback,
+                                               lambda: self._check_cancellation())
+        
+        logger.info(f"🔍 Splitting search into {len(windows)} sub-queries of {SEARCH_SHARD_DAYS} days")
+        if progress_callback:
+            progress_callback("Söker efter emails...", 0)
+        if gui_update_callback:
+            gui_update_callback()
+        
+        def search_window(window):
+            searcher = self._get_searcher()
+            window_query = searcher.build_search_query(sender_email, *window)
+            return searcher.search_emails(window_query, cancel_check=lambda: self._check_cancellation())
+        
+        executor = ThreadPoolExecutor(max_workers=min(MAX_SEARCH_WORKERS, len(windows)),
+                                      thread_name_prefix="gmail-search")
+        try:
+            futures = [executor.submit(search_window, window) for window in windows]
+            for completed, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if self._check_cancellation():
+                    return []
+                self._tick(f"Sökt {completed}/{len(windows)} veckor...", 0,
+                           progress_callback, gui_update_callback,
+                           force=completed == len(windows))
+            
+            # Merge in window order and drop IDs found by more than one sub-query
+            message_ids = list(dict.fromkeys(
+                message_id for future in futures for message_id in future.result()))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        logger.info(f"FINAL RESULT: Found {len(message_ids)} emails in {len(windows)} sub-queries")
+        return message_ids
+    
+    def _run_on_main_thread(self, func, *args, fallback=None):
+        """Run a Tk callable on the main thread and block until it returns.
+        
+        Returns fallback instead if the operation is cancelled or the window goes away
+        before the call completes.
+        """
+        if self.root is None or threading.current_thread() is threading.main_thread():
+            return func(*args)
+        
+        result = [None]
+        error = [None]
+        done = threading.Event()
+        
+        def run():
+            try:
+                result[0] = func(*args)
+            except Exception as e:
+                error[0] = e
+            finally:
+                done.set()
+        
+        try:
+            self.root.after(0, run)
+        except (tk.TclError, RuntimeError):
+            # The window has been destroyed
+            return fallback
+        while not done.wait(0.1):
+            if self._check_cancellation() or not self._root_alive():
+                return fallback
+        if error[0]:
+            raise error[0]
+        return result[0]
+    
+    def _root_alive(self) -> bool:
+        """Check whether the root window still exists"""
+        try:
+            return bool(self.root.winfo_exists())
+        except (tk.TclError, RuntimeError):
+            # Destroyed, or the main thread has left mainloop
+            return False
     
     def _process_single_email(self, message_id: str, email_num: int, total_emails: int, 
-                             progress_callback=None, gui_update_callback=None) -> Tuple[int, int, int]:
+                             progress_callback=None, gui_update_callback=None,
+                             email_details: Optional[Dict] = None) -> Tuple[int, int, int]:
+        """Download all JPG attachments of one email - runs in a worker thread"""
         downloaded = 0
         skipped = 0
         total_size = 0
         
         progress = int((email_num / total_emails) * 100)
-        if progress_callback:
-            progress_callback(f"Bearbetar email {email_num}/{total_emails}", progress)
-        if gui_update_callback:
-            gui_update_callback()
+        attachment_processor = self._get_attachment_processor()
         
-        email_details = self.attachment_processor.get_email_details(message_id, cancel_check=lambda: self._check_cancellation())
+        # Details are normally prefetched in a batch; fetch individually if that failed
+        if email_details is None:
+            email_details = attachment_processor.get_email_details(message_id, cancel_check=lambda: self._check_cancellation())
         if not email_details:
             return downloaded, skipped, total_size
         
-        logger.info(f"📨 Processing email from: {email_details['sender']}")
+        logger.info(f"📨 Processing email {message_id}")
         
-        attachments = self.attachment_processor.extract_attachments(email_details['payload'])
-        jpg_attachments = [att for att in attachments if att['filename'].lower().endswith(('.jpg', '.jpeg'))]
+        # extract_attachments only returns JPG attachments
+        jpg_attachments = attachment_processor.extract_attachments(email_details['payload'])
         
         if not jpg_attachments:
             logger.info("   No JPG attachments found in this email")
@@ -302,61 +497,63 @@ class GmailDownloader:
         
         logger.info(f"   Found {len(jpg_attachments)} JPG attachment(s)")
         
-        for att_num, attachment in enumerate(jpg_attachments, 1):
+        for att_num, (original_filename, attachment_id, attachment_size) in enumerate(jpg_attachments, 1):
             if self._check_cancellation():
                 logger.info(f"Download cancelled during attachment {att_num} processing")
                 return downloaded, skipped, total_size
             
             if len(jpg_attachments) > 1:
-                if progress_callback:
-                    progress_callback(f"Email {email_num}/{total_emails} - Bilaga {att_num}/{len(jpg_attachments)}", progress)
-                if gui_update_callback:
-                    gui_update_callback()
+                self._tick(f"Email {email_num}/{total_emails} - Bilaga {att_num}/{len(jpg_attachments)}",
+                           progress, progress_callback, gui_update_callback)
             
-            # Check cancellation before download
-            if self._check_cancellation():
-                logger.info(f"Download cancelled before attachment {att_num} download")
-                return downloaded, skipped, total_size
+            with self._save_lock:
+                # Check if file was already downloaded in current session - skip silently
+                if self.download_manager.check_duplicate_in_session(original_filename):
+                    skipped += 1
+                    logger.info(f"🔄 Skipping duplicate from session: {original_filename}")
+                    continue  # Continue with next attachment
+                
+                # Fast path: claim the name in one call; only existing files need the dialog
+                fd = self.download_manager.create_exclusive(original_filename)
+                if fd is not None:
+                    final_filename = original_filename
+                else:
+                    # The conflict dialog must be shown by the Tk main thread
+                    final_filename = self._run_on_main_thread(
+                        self.download_manager.handle_filename_conflict, original_filename, self.root,
+                        fallback="SKIP")
+                
+                if final_filename is None:
+                    self.cancel_operation()  # Cancel the entire process if user chooses to cancel
+                    return downloaded, skipped, total_size
+                elif final_filename == "SKIP":
+                    skipped += 1
+                    logger.info(f"Skipped file: {original_filename}")
+                    continue  # Continue with next attachment
+                
+                # Reserve the name so parallel workers skip the same attachment
+                self.download_manager.downloaded_in_session.add(original_filename)
             
-            file_data = self.attachment_processor.download_attachment(message_id, attachment['attachment_id'], cancel_check=lambda: self._check_cancellation())
-            if not file_data:
+            # Stream the attachment straight into its destination file. A cancellation
+            # before the download starts makes it return None, which also removes a
+            # file claimed by create_exclusive()
+            file_size = self.download_manager.save_attachment(
+                final_filename,
+                lambda f: attachment_processor.download_attachment_to(
+                    f, message_id, attachment_id,
+                    cancel_check=lambda: self._check_cancellation()),
+                size_hint=attachment_size, fd=fd)
+            if file_size is None:
+                with self._save_lock:
+                    self.download_manager.downloaded_in_session.discard(original_filename)
                 # Check if it's due to cancellation
                 if self._check_cancellation():
                     logger.info(f"Download cancelled during attachment {att_num} download")
                     return downloaded, skipped, total_size
                 continue
             
-            # Check cancellation after download but before file conflict dialog
-            if self._check_cancellation():
-                logger.info(f"Download cancelled after attachment {att_num} download")
-                return downloaded, skipped, total_size
-            
-            original_filename = attachment['filename']
-            
-            # Check if file was already downloaded in current session - skip silently
-            if self.download_manager.check_duplicate_in_session(original_filename):
-                skipped += 1
-                logger.info(f"🔄 Skipping duplicate from session: {original_filename}")
-                continue  # Continue with next attachment
-            
-            final_filename = self.download_manager.handle_filename_conflict(original_filename, self.root)
-            
-            if final_filename is None:
-                self.cancel_operation()  # Cancel the entire process if user chooses to cancel
-                return downloaded, skipped, total_size
-            elif final_filename == "SKIP":
-                skipped += 1
-                logger.info(f"Skipped file: {original_filename}")
-                continue  # Continue with next attachment
-            
-            # Check cancellation before file save
-            if self._check_cancellation():
-                logger.info(f"Download cancelled before saving attachment {att_num}")
-                return downloaded, skipped, total_size
-            
-            if self.download_manager.save_file(final_filename, file_data):
-                downloaded += 1
-                total_size += len(file_data)
+            downloaded += 1
+            total_size += file_size
         
         return downloaded, skipped, total_size
     
@@ -376,6 +573,7 @@ class GmailDownloader:
             
             self.download_manager = DownloadManager(output_dir)
             self.download_manager.cancel_event = self.cancel_event
+            self.download_manager.icon_callback = self.icon_callback
             
             if progress_callback:
                 progress_callback("Bygger sökfråga...", 5)
@@ -383,7 +581,8 @@ class GmailDownloader:
                 gui_update_callback()
             
             query = self.searcher.build_search_query(sender_email, start_date, end_date)
-            message_ids = self.searcher.search_emails(query, progress_callback, gui_update_callback, lambda: self._check_cancellation())
+            message_ids = self._search_message_ids(sender_email, start_date, end_date,
+                                                   progress_callback, gui_update_callback)
             
             if self._check_cancellation():
                 return {"cancelled": True}
@@ -423,26 +622,48 @@ class GmailDownloader:
             total_size = 0
             skipped_count = 0
             processed_emails = 0
+            total_emails = len(message_ids)
             
-            for i, message_id in enumerate(message_ids, 1):
-                if self._check_cancellation():
-                    logger.info(f"Download cancelled after processing {processed_emails} emails")
-                    return {"cancelled": True}
-                
-                downloaded, skipped, size = self._process_single_email(
-                    message_id, i, len(message_ids), 
-                    progress_callback, gui_update_callback)
-                
-                # Check cancellation after processing each email
-                if self._check_cancellation():
-                    logger.info(f"Download cancelled after processing email {i}")
-                    return {"cancelled": True}
+            executor = ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS,
+                                          thread_name_prefix="gmail-download")
+            try:
+                futures = []
+                for start in range(0, total_emails, MAX_BATCH_SIZE):
+                    if self._check_cancellation():
+                        logger.info("Download cancelled while fetching email details")
+                        return {"cancelled": True}
+                    
+                    # One batched round trip fetches the details for a whole chunk,
+                    # while workers download attachments from the previous chunks
+                    chunk = message_ids[start:start + MAX_BATCH_SIZE]
+                    details = self.attachment_processor.get_email_details_batch(
+                        chunk, cancel_check=lambda: self._check_cancellation())
+                    
+                    for i, message_id in enumerate(chunk, start + 1):
+                        futures.append(executor.submit(
+                            self._process_single_email, message_id, i, total_emails,
+                            progress_callback, gui_update_callback, details.get(message_id)))
                 
-                total_downloaded += downloaded
-                skipped_count += skipped
-                total_size += size
-                if downloaded > 0 or skipped > 0:
-                    processed_emails += 1
+                for completed, future in enumerate(as_completed(futures), 1):
+                    downloaded, skipped, size = future.result()
+                    
+                    # Check cancellation after processing each email
+                    if self._check_cancellation():
+                        logger.info(f"Download cancelled after processing {completed} emails")
+                        return {"cancelled": True}
+                    
+                    total_downloaded += downloaded
+                    skipped_count += skipped
+                    total_size += size
+                    if downloaded > 0 or skipped > 0:
+                        processed_emails += 1
+                    
+                    self._tick(f"Bearbetat email {completed}/{total_emails}",
+                               int((completed / total_emails) * 100),
+                               progress_callback, gui_update_callback)
+            finally:
+                # Drop queued emails; running workers stop at their next cancellation check
+                executor.shutdown(wait=True, cancel_futures=True)
             
             result = {
                 "total_emails": len(message_ids),
@@ -3,9 +3,9 @@
 Gmail attachment processing functionality
 """
 
-import base64
+import binascii
 import logging
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
 try:
     from googleapiclient.errors import HttpError
@@ -15,6 +15,33 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Gmail accepts up to 100 calls per batch, but recommends at most 50 to avoid rate limiting
+MAX_BATCH_SIZE = 50
+
+# Partial-response masks - only the fields we actually read are sent and parsed.
+# Headers and inline body data (text/HTML) are left out; the sender is already fixed
+# by the search query. The payload and three nested MIME levels are masked, and the innermost
+# unselected 'parts' keeps any deeper nesting intact.
+_PART_FIELDS = 'filename,body(attachmentId,size)'
+EMAIL_DETAILS_FIELDS = (f'id,payload({_PART_FIELDS},parts({_PART_FIELDS},'
+                        f'parts({_PART_FIELDS},parts({_PART_FIELDS},parts))))')
+ATTACHMENT_FIELDS = 'data'
+
+# Attachments are decoded and written in ~1 MiB pieces. The window is a whole
+# number of base64 quanta (4 chars -> 3 bytes) so each piece decodes on its own.
+WRITE_CHUNK_SIZE = 1 << 20
+_DECODE_WINDOW = (WRITE_CHUNK_SIZE // 3) * 4
+
+# Maps the URL-safe base64 alphabet used by Gmail onto the standard one
+_B64_TRANS = bytes.maketrans(b'-_', b'+/')
+
+
+def _to_standard_b64(data: str) -> bytes:
+    """Translate Gmail's URL-safe base64 into padded standard base64 bytes."""
+    raw = data.encode('ascii').translate(_B64_TRANS)
+    padding = -len(raw) % 4
+    return raw + b'=' * padding if padding else raw
+
 class AttachmentProcessor:
     def __init__(self, gmail_service):
         self.service = gmail_service
@@ -26,24 +53,15 @@ class AttachmentProcessor:
                 logger.info("Email details retrieval cancelled")
                 return None
                 
-            message = self.service.users().messages().get(userId='me', id=message_id).execute()
+            message = self.service.users().messages().get(
+                userId='me', id=message_id, fields=EMAIL_DETAILS_FIELDS).execute()
             
             # Check cancellation after API call
             if cancel_check and cancel_check():
                 logger.info("Email details processing cancelled")
                 return None
                 
-            headers = message['payload'].get('headers', [])
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'Inget ämne')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Okänd avsändare')
-            date = next((h['value'] for h in headers if h['name'] == 'Date'), 'Okänt datum')
-            return {
-                'id': message_id,
-                'subject': subject,
-                'sender': sender,
-                'date': date,
-                'payload': message['payload']
-            }
+            return self._build_email_details(message_id, message)
         except HttpError as error:
             logger.warning(f"Failed to get email details for {message_id}: {error}")
             return None
@@ -51,46 +69,99 @@ class AttachmentProcessor:
             logger.warning(f"Unexpected error getting email details: {e}")
             return None
     
-    def _process_email_part(self, part: Dict, attachments: List[Dict]) -> None:
-        if part.get('filename'):
-            filename = part['filename']
-            if filename.lower().endswith(('.jpg', '.jpeg')):
-                attachment_id = part['body'].get('attachmentId')
-                if attachment_id:
-                    attachments.append({
-                        'filename': filename,
-                        'attachment_id': attachment_id,
-                        'size': part['body'].get('size', 0)
-                    })
-        if 'parts' in part:
-            for subpart in part['parts']:
-                self._process_email_part(subpart, attachments)
+    def get_email_details_batch(self, message_ids: List[str], cancel_check=None) -> Dict[str, Dict]:
+        """Fetch details for many emails using batched HTTP requests (one round trip per batch)"""
+        details = {}
+        
+        def handle_response(request_id, response, exception):
+            if exception is not None:
+                logger.warning(f"Failed to get email details for {request_id}: {exception}")
+                return
+            try:
+                details[request_id] = self._build_email_details(request_id, response)
+            except Exception as e:
+                logger.warning(f"Unexpected error getting email details: {e}")
+        
+        for start in range(0, len(message_ids), MAX_BATCH_SIZE):
+            if cancel_check and cancel_check():
+                logger.info("Batched email details retrieval cancelled")
+                return details
+            
+            batch = self.service.new_batch_http_request(callback=handle_response)
+            for message_id in message_ids[start:start + MAX_BATCH_SIZE]:
+                batch.add(self.service.users().messages().get(
+                              userId='me', id=message_id, fields=EMAIL_DETAILS_FIELDS),
+                          request_id=message_id)
+            try:
+                batch.execute()
+            except HttpError as error:
+                logger.warning(f"Batched email details request failed: {error}")
+            except Exception as e:
+                logger.warning(f"Unexpected error in batched email details request: {e}")
+        
+        return details
     
-    def extract_attachments(self, payload: Dict) -> List[Dict]:
+    @staticmethod
+    def _build_email_details(message_id: str, message: Dict) -> Dict:
+        # Only the MIME structure is requested (see EMAIL_DETAILS_FIELDS) - no headers
+        return {
+            'id': message_id,
+            'payload': message['payload']
+        }
+    
+    def extract_attachments(self, payload: Dict) -> List[Tuple[str, str, int]]:
+        """Return (filename, attachment_id, size) for every JPG attachment in the payload"""
         attachments = []
-        self._process_email_part(payload, attachments)
+        # Walk the MIME tree with an explicit stack instead of recursion
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            filename = part.get('filename')
+            if filename and filename.lower().endswith(('.jpg', '.jpeg')):
+                body = part.get('body', {})
+                attachment_id = body.get('attachmentId')
+                if attachment_id:
+                    attachments.append((filename, attachment_id, body.get('size', 0)))
+            subparts = part.get('parts')
+            if subparts:
+                # Reversed so parts are popped in document order
+                stack.extend(reversed(subparts))
         return attachments
     
-    def download_attachment(self, message_id: str, attachment_id: str, cancel_check=None) -> Optional[bytes]:
+    def download_attachment_to(self, dest: BinaryIO, message_id: str, attachment_id: str,
+                               cancel_check=None) -> Optional[int]:
+        """
+        Download an attachment and write it to a binary file object in chunks
+        
+        The Gmail API only returns attachments as base64 in the JSON response, so the
+        decoded file is produced window by window instead of as one large bytes object.
+        
+        Returns:
+            Number of bytes written, or None if the download failed or was cancelled
+        """
         try:
             # Check cancellation before API call
             if cancel_check and cancel_check():
                 logger.info("Attachment download cancelled")
                 return None
                 
-            attachment = self.service.users().messages().attachments().get(userId='me', messageId=message_id, id=attachment_id).execute()
+            attachment = self.service.users().messages().attachments().get(
+                userId='me', messageId=message_id, id=attachment_id, fields=ATTACHMENT_FIELDS).execute()
             
             # Check cancellation after API call but before data processing
             if cancel_check and cancel_check():
                 logger.info("Attachment download cancelled after API call")
                 return None
-                
-            data = attachment['data']
-            file_data = base64.urlsafe_b64decode(data)
-            return file_data
+            
+            # Translated once up front; every window is then a zero-copy slice of whole quanta
+            data = memoryview(_to_standard_b64(attachment['data']))
+            written = 0
+            for start in range(0, len(data), _DECODE_WINDOW):
+                written += dest.write(binascii.a2b_base64(data[start:start + _DECODE_WINDOW]))
+            return written
         except HttpError as error:
             logger.warning(f"Failed to download attachment {attachment_id}: {error}")
             return None
         except Exception as e:
             logger.warning(f"Unexpected error downloading attachment: {e}")
-            return None
\ No newline at end of file
+            return None
@@ -5,7 +5,7 @@ Gmail email searching functionality
 
 import datetime
 import logging
-from typing import List
+from typing import List, Tuple
 
 try:
     from googleapiclient.errors import HttpError
@@ -15,45 +15,74 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Partial-response mask for messages.list - only message IDs and paging are used
+SEARCH_FIELDS = 'messages/id,nextPageToken'
+
+# Date format used in the GUI and in Gmail's after:/before: operators
+_DATE_FMT = "%Y-%m-%d"
+_ONE_DAY = datetime.timedelta(days=1)
+
+
+def _next_day(date_str: str) -> str:
+    """Return the ISO date of the day after date_str."""
+    return (datetime.datetime.strptime(date_str, _DATE_FMT).date() + _ONE_DAY).isoformat()
+
+
+def shard_date_range(start_date: str, end_date: str, days: int) -> List[Tuple[str, str]]:
+    """Split an inclusive date range into consecutive windows of at most `days` days.
+
+    Single-day windows get an empty end date, matching build_search_query's single-day form.
+    """
+    start = datetime.datetime.strptime(start_date, _DATE_FMT).date()
+    end = datetime.datetime.strptime(end_date, _DATE_FMT).date()
+    step = datetime.timedelta(days=days)
+    windows = []
+    while start <= end:
+        window_end = min(start + step - _ONE_DAY, end)
+        windows.append((start.isoformat(), window_end.isoformat() if window_end != start else ""))
+        start = window_end + _ONE_DAY
+    return windows
+
+
+def _build_search_query(sender_email: str, start_date: str, end_date: str, has_attachment: bool) -> str:
+    query_parts = []
+    if sender_email:
+        query_parts.append(f"from:{sender_email}")
+    if start_date:
+        query_parts.append(f"after:{start_date}")
+        logger.info(f"Start date: Including from {start_date} using after:{start_date}")
+    
+    # Only add end date if it's different from start date
+    if end_date and end_date != start_date:
+        try:
+            next_day_str = _next_day(end_date)
+        except ValueError:
+            logger.error(f"Invalid end date format: {end_date}")
+            raise ValueError(f"Invalid end date format: {end_date}")
+        query_parts.append(f"before:{next_day_str}")
+        logger.info(f"End date: Including {end_date} by using before:{next_day_str}")
+    elif start_date and not end_date:
+        try:
+            next_day_str = _next_day(start_date)
+        except ValueError:
+            logger.error(f"Invalid date format: {start_date}")
+            raise ValueError(f"Invalid date format: {start_date}")
+        query_parts.append(f"before:{next_day_str}")
+        logger.info(f"Single day: Searching {start_date} using before:{next_day_str}")
+    
+    if has_attachment:
+        query_parts.append("has:attachment")
+    query = " ".join(query_parts)
+    logger.info(f"🔍 Built search query: '{query}'")
+    return query
+
+
 class GmailSearcher:
     def __init__(self, gmail_service):
         self.service = gmail_service
     
     def build_search_query(self, sender_email: str, start_date: str, end_date: str, has_attachment: bool = True) -> str:
-        query_parts = []
-        if sender_email:
-            query_parts.append(f"from:{sender_email}")
-        if start_date:
-            query_parts.append(f"after:{start_date}")
-            logger.info(f"Start date: Including from {start_date} using after:{start_date}")
-        
-        # Only add end date if it's different from start date
-        if end_date and end_date != start_date:
-            try:
-                end_dt = datetime.datetime.strptime(end_date, "%Y-%m-%d")
-                next_day = end_dt + datetime.timedelta(days=1)
-                next_day_str = next_day.strftime("%Y-%m-%d")
-                query_parts.append(f"before:{next_day_str}")
-                logger.info(f"End date: Including {end_date} by using before:{next_day_str}")
-            except ValueError:
-                logger.error(f"Invalid end date format: {end_date}")
-                raise ValueError(f"Invalid end date format: {end_date}")
-        elif start_date and not end_date:
-            try:
-                start_dt = datetime.datetime.strptime(start_date, "%Y-%m-%d")
-                next_day = start_dt + datetime.timedelta(days=1)
-                next_day_str = next_day.strftime("%Y-%m-%d")
-                query_parts.append(f"before:{next_day_str}")
-                logger.info(f"Single day: Searching {start_date} using before:{next_day_str}")
-            except ValueError:
-                logger.error(f"Invalid date format: {start_date}")
-                raise ValueError(f"Invalid date format: {start_date}")
-        
-        if has_attachment:
-            query_parts.append("has:attachment")
-        query = " ".join(query_parts)
-        logger.info(f"🔍 Built search query: '{query}'")
-        return query
+        return _build_search_query(sender_email, start_date, end_date, has_attachment)
     
     def search_emails(self, query: str, progress_callback=None, gui_update_callback=None, cancel_check=None) -> List[str]:
         try:
@@ -72,7 +101,7 @@ class GmailSearcher:
                     logger.info("Email search cancelled by user")
                     return []
                 try:
-                    search_params = {'userId': 'me', 'q': query}
+                    search_params = {'userId': 'me', 'q': query, 'fields': SEARCH_FIELDS}
                     if page_token:
                         search_params['pageToken'] = page_token
                     results = self.service.users().messages().list(**search_params).execute()
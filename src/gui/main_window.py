@@ -11,8 +11,10 @@ import re
 import subprocess
 import sys
 import threading
+from importlib.util import find_spec
 from pathlib import Path
 from tkinter import filedialog, messagebox
+from tkinter.font import Font
 
 try:
     import ttkbootstrap as tb
@@ -31,12 +33,16 @@ except ImportError:
     print("Error: ttkbootstrap not installed. Install with: pip install ttkbootstrap")
     exit(1)
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 from ..config import (
     load_config, save_config, get_update_settings,
     set_skip_version, update_last_check_date, get_app_directory, get_user_downloads_folder,
     should_check_for_updates, set_update_setting
 )
-from ..gmail.downloader import GmailDownloader
 from ..kb.processor import KBProcessor
 from ..version import __version__ as VERSION
 from ..security import get_secure_ops, get_default_validator
@@ -44,17 +50,26 @@ from ..update import create_version_checker, show_update_check_result, UpdateNot
 
 logger = logging.getLogger(__name__)
 
-# Check for required dependencies
-try:
-    # Just check for import availability without actually importing
-    import google.auth.transport.requests  # noqa: F401
-    import google.oauth2.credentials  # noqa: F401
-    import googleapiclient.discovery  # noqa: F401
-    GMAIL_AVAILABLE = True
-except ImportError:
+# Platform checks used when opening files and folders
+_IS_WIN = sys.platform.startswith('win')
+
+# Accepted full date formats: YYYY-MM-DD and YYYYMMDD
+_DATE_FULL_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DATE_COMPACT_RE = re.compile(r"^\d{8}$")
+
+def _module_available(name: str) -> bool:
+    """Check that a module can be imported without importing it"""
+    try:
+        return find_spec(name) is not None
+    except ImportError:
+        return False
+
+# Check for required dependencies. The Google client libraries are slow to import,
+# so they are only located here and loaded when a Gmail download starts
+GMAIL_AVAILABLE = all(_module_available(name) for name in ("google.auth", "google.oauth2", "googleapiclient"))
+if not GMAIL_AVAILABLE:
     print("Warning: Google API libraries not installed. Gmail functionality will be disabled.")
     print("Install with: pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client")
-    GMAIL_AVAILABLE = False
 
 try:
     # Just check for import availability without actually importing
@@ -66,7 +81,37 @@ except ImportError:
     IMAGE_PROCESSING_AVAILABLE = False
 
 class CombinedApp:
+    # Shared options for the folder/file browse buttons and the "?" help buttons
+    _BROWSE_BUTTON_KW = {"bootstyle": INFO, "width": 12}
+    _HELP_BUTTON_KW = {"text": "?", "width": 3, "bootstyle": "info-outline"}
+    # Fixed attribute layout: every instance attribute must be listed here
+    __slots__ = (
+        "_app_dir", "_date_label_state", "_font_bold", "_font_mono", "_font_normal",
+        "_font_small", "_last_browse_dir", "_loading_config", "_manual_path",
+        "_packed_sections", "_pending_progress", "_progress_lock", "_scroll_update_id",
+        "alias_status_label", "alias_status_var", "auto_check_enabled_var",
+        "browse_kb_input_btn", "browse_kb_output_btn", "cancel_btn", "cancel_event",
+        "config", "credentials_file_var", "csv_file_path", "csv_status_label",
+        "csv_status_var", "delete_original_files_var", "end_date_entry",
+        "end_date_has_placeholder", "end_date_validation_label", "end_date_var",
+        "gmail_account_var", "gmail_check", "gmail_downloader", "gmail_enabled",
+        "gmail_frame", "gmail_output_dir_var", "gmail_running", "kb_auto_info", "kb_check",
+        "kb_enabled", "kb_frame", "kb_input_dir_var", "kb_input_entry", "kb_output_dir_var",
+        "kb_output_entry", "kb_processor", "kb_running", "keep_renamed_var", "main_canvas",
+        "main_frame", "main_scrollbar", "open_folder_link", "placeholder_text",
+        "processing_thread", "progress_bar", "progress_frame", "progress_label",
+        "progress_message_var", "root", "same_dir_check", "secure_ops", "sender_var",
+        "start_btn", "start_date_entry", "start_date_has_placeholder",
+        "start_date_validation_label", "start_date_var", "status_var", "use_alias_checkbox",
+        "use_alias_var", "use_same_output_dir_var", "validator"
+    )
+    
     def __init__(self):
+        # The application directory does not change while the app runs
+        self._app_dir = get_app_directory()
+        self._manual_path = self._app_dir / "Manual.pdf"
+        # Folder of the last file or directory picked in a browse dialog
+        self._last_browse_dir = None
         self.setup_gui()
         self.config = load_config()
         self.gmail_downloader = None
@@ -81,7 +126,18 @@ class CombinedApp:
         self.kb_processor.cancel_event = self.cancel_event
 
         self.load_config_to_gui()
+        self._show_window()
     
+    def _show_window(self):
+        """Show the fully built main window (it is hidden while widgets are created)"""
+        # Lay out everything once, then map the window
+        self.root.update_idletasks()
+        self.root.deiconify()
+        
+        # Force window to the front and ensure it's visible
+        self.root.lift()
+        self.root.attributes('-topmost', True)
+        self.root.after(100, self.root.attributes, '-topmost', False)
     
     def ensure_default_folders(self):
         """Ensure default download folder exists"""
@@ -115,7 +171,7 @@ class CombinedApp:
         """Get base directory for icon files"""
         if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
             return Path(sys._MEIPASS)
-        return get_app_directory()
+        return self._app_dir
 
     def set_window_icon(self, window):
         """Set application icon on a window (cross-platform)"""
@@ -154,6 +210,16 @@ class CombinedApp:
     def setup_gui(self):
         """Setup the main GUI window"""
         self.root = tb.Window(themename="superhero")
+        # Keep the window hidden until all widgets exist - Tk then lays it out once
+        # instead of redrawing as every widget is packed
+        self.root.withdraw()
+        
+        # Fonts shared by the main window widgets - Tk resolves each named font once
+        # instead of parsing a font tuple for every widget
+        self._font_normal = Font(root=self.root, family='Arial', size=10)
+        self._font_small = Font(root=self.root, family='Arial', size=9)
+        self._font_bold = Font(root=self.root, family='Arial', size=10, weight='bold')
+        self._font_mono = Font(root=self.root, family='Consolas', size=11)
         self.root.title("DJs app för hantering av filer från 'Svenska Tidningar'")
         
         # Set window icon (cross-platform)
@@ -171,17 +237,10 @@ class CombinedApp:
         x = min(50, screen_width // 10)  # 50 pixels from left, but not more than 1/10 of screen width
         y = 5  # 5 pixels from top, positioned very high on screen
         
-        # Set initial size without position
-        self.root.geometry(f"{window_width}x{window_height}")
-        self.root.update_idletasks()
-        
-        # Now set final position
+        # Set size and position in one call - a separate size-only call would make the
+        # window manager place the window twice
         self.root.geometry(f"{window_width}x{window_height}+{x}+{y}")
         
-        # Force window to the front and ensure it's visible
-        self.root.lift()
-        self.root.attributes('-topmost', True)
-        self.root.after(100, lambda: self.root.attributes('-topmost', False))
         # Add a canvas+scrollbar for main content
         canvas = tk.Canvas(self.root)
         scrollbar = tb.Scrollbar(self.root, orient="vertical", command=canvas.yview)
@@ -192,8 +251,14 @@ class CombinedApp:
         self.main_scrollbar = scrollbar
         main_frame = tb.Frame(canvas)
         canvas.create_window((0, 0), window=main_frame, anchor="nw")
-        def on_configure(event):
+        self._scroll_update_id = None
+        def update_scrollregion():
+            self._scroll_update_id = None
             canvas.configure(scrollregion=canvas.bbox("all"))
+        def on_configure(event):
+            # Resizing and packing send bursts of events - update the scroll region once per burst
+            if self._scroll_update_id is None:
+                self._scroll_update_id = canvas.after(50, update_scrollregion)
         main_frame.bind("<Configure>", on_configure)
         self.main_frame = main_frame
 
@@ -256,11 +321,20 @@ class CombinedApp:
         
         # Progress
         self.progress_message_var = tk.StringVar(value="")
+        # Latest (message, progress) from the worker, applied by one queued main-thread callback
+        self._pending_progress = None
+        self._progress_lock = threading.Lock()
         
         # Track which operations are running
         self.gmail_running = False
         self.kb_running = False
         
+        # Set while load_config_to_gui fills in the widgets - it updates the UI state once itself
+        self._loading_config = False
+        
+        # Whether the Gmail and KB sections are currently packed
+        self._packed_sections = (False, False)
+        
         # Placeholder state tracking
         self.placeholder_text = "ÅÅÅÅ-MM-DD"
         self.start_date_has_placeholder = False
@@ -325,22 +399,25 @@ class CombinedApp:
                                 font=('Arial', 8), foreground="gray")
         version_label.place(relx=1.0, rely=1.0, anchor="se", x=-10, y=-10)
         
-        # Initial state
-        self.update_ui_state()
+        # Initial state is applied by load_config_to_gui once the settings are in place
     
     def validate_date_entry(self, input_str: str) -> bool:
         # Allow empty input (user deleting)
         if not input_str:
             return True
-        # Allow only digits and dashes, max 10 chars (YYYY-MM-DD = 10 chars)
-        if not re.match(r"^[0-9-]{0,10}$", input_str):
-            return False
-        # Only allow at most 2 dashes, and not at the start
-        if input_str.count('-') > 2 or input_str.startswith('-'):
-            return False
         # Allow up to 10 characters for full date format
         if len(input_str) > 10:
             return False
+        # Allow only ASCII digits and at most 2 dashes, not at the start - one pass
+        # over the (short) string, called on every keystroke
+        dashes = 0
+        for i, c in enumerate(input_str):
+            if c == '-':
+                dashes += 1
+                if i == 0 or dashes > 2:
+                    return False
+            elif not '0' <= c <= '9':
+                return False
         return True
 
     def full_date_validation(self, field: str):
@@ -364,9 +441,9 @@ class CombinedApp:
         gmail_account_frame = tb.Frame(self.gmail_frame)
         gmail_account_frame.pack(fill="x", pady=(0, 15))
         
-        tb.Label(gmail_account_frame, text="Gmail-konto:", font=('Arial', 10)).pack(side="left")
+        tb.Label(gmail_account_frame, text="Gmail-konto:", font=self._font_normal).pack(side="left")
         gmail_entry = tb.Entry(gmail_account_frame, textvariable=self.gmail_account_var, 
-                              width=40, font=('Arial', 10))
+                              width=40, font=self._font_normal)
         gmail_entry.pack(side="left", padx=(15, 0), fill="x", expand=True)
         self.add_tooltip(gmail_entry, "Till vilket gmail-konto skickas filerna från KB?")
         
@@ -377,126 +454,106 @@ class CombinedApp:
         # Frame for "Credentials-fil:" label and question mark
         cred_label_frame = tb.Frame(creds_frame)
         cred_label_frame.pack(anchor="w")
-        tb.Label(cred_label_frame, text="Credentials-fil:", font=('Arial', 10)).pack(side="left")
-        help_label = tb.Label(cred_label_frame, text=" ?", font=('Arial', 10, "bold"), foreground="green", cursor="hand2")
+        tb.Label(cred_label_frame, text="Credentials-fil:", font=self._font_normal).pack(side="left")
+        help_label = tb.Label(cred_label_frame, text=" ?", font=self._font_bold, foreground="green", cursor="hand2")
         help_label.pack(side="left")
-        def open_manual_event(event=None):
-            manual_path = get_app_directory() / "Manual.pdf"
-            if manual_path.exists():
-                try:
-                    if sys.platform.startswith('win'):
-                        # Use os.startfile instead of subprocess for better Windows compatibility
-                        import os
-                        os.startfile(str(manual_path))
-                    elif sys.platform.startswith('darwin'):
-                        self.secure_ops.safe_subprocess_run(['open'], file_arg=str(manual_path))
-                    else:
-                        self.secure_ops.safe_subprocess_run(['xdg-open'], file_arg=str(manual_path))
-                except Exception as e:
-                    messagebox.showerror("Fel", f"Kunde inte öppna Manual.pdf: {e}")
-            else:
-                messagebox.showerror("Fel", f"Manual.pdf hittades inte i programmets mapp.\nSökte i: {manual_path}")
-        help_label.bind("<Button-1>", open_manual_event)
+        help_label.bind("<Button-1>", lambda event: self.open_manual())
         
         creds_path_frame = tb.Frame(creds_frame)
         creds_path_frame.pack(fill="x")
         
         creds_entry = tb.Entry(creds_path_frame, textvariable=self.credentials_file_var, 
-                              font=('Arial', 10))
+                              font=self._font_normal)
         creds_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
         self.add_tooltip(creds_entry, "För att appen ska kunna hämta bilagor från gmail-kontot behöver du en OAuth JSON-fil. Det är en konfigurationsfil som innehåller autentiseringsuppgifter för att få säker åtkomst till Gmail API. Se Hjälp för info om hur du skaffar en sådan fil.")
         
         browse_creds_btn = tb.Button(creds_path_frame, text="Välj fil...", 
-                                    command=self.browse_credentials_file, 
-                                    bootstyle=INFO, width=12)
+                                    command=self.browse_credentials_file, **self._BROWSE_BUTTON_KW)
         browse_creds_btn.pack(side="right")
         
         # Sender email
         sender_frame = tb.Frame(self.gmail_frame)
         sender_frame.pack(fill="x", pady=(0, 15))
         
-        tb.Label(sender_frame, text="Avsändar-email:", font=('Arial', 10)).pack(anchor="w", pady=(0, 5))
+        tb.Label(sender_frame, text="Avsändar-email:", font=self._font_normal).pack(anchor="w", pady=(0, 5))
         
-        sender_entry_frame = tb.Frame(sender_frame)
-        sender_entry_frame.pack(fill="x")
-        sender_entry = tb.Entry(sender_entry_frame, textvariable=self.sender_var, 
-                               width=40, font=('Arial', 10))
-        sender_entry.pack(side="left", padx=(0, 0), fill="x", expand=True)
+        sender_entry = tb.Entry(sender_frame, textvariable=self.sender_var, 
+                               width=40, font=self._font_normal)
+        sender_entry.pack(fill="x")
         self.add_tooltip(sender_entry, "Från vilken avsändare kommer mejlen med bilagorna som ska hämtas? Svenska tidningars avsändaradress noreply@kb.se är automatiskt vald.")
         
         tb.Label(sender_frame, text="Lämna tomt för noreply@kb.se", 
-                 font=('Arial', 9), foreground="lightblue").pack(anchor="w", pady=(5, 0))
+                 font=self._font_small, foreground="lightblue").pack(anchor="w", pady=(5, 0))
         
         # Date range
         date_frame = tb.Frame(self.gmail_frame)
         date_frame.pack(fill="x", pady=(0, 15))
         
+        # Both date entries share one registered Tcl validation command
+        vcmd_date = (self.root.register(self.validate_date_entry), '%P')
+        
         # Start date with validation
         start_date_frame = tb.Frame(date_frame)
         start_date_frame.pack(side="left", padx=(0, 20))
-        tb.Label(start_date_frame, text="Startdatum:", font=('Arial', 10)).pack(anchor="w", pady=(0, 5))
-        vcmd_start = (self.root.register(self.validate_date_entry), '%P')
+        tb.Label(start_date_frame, text="Startdatum:", font=self._font_normal).pack(anchor="w", pady=(0, 5))
         start_date_entry = tb.Entry(start_date_frame, textvariable=self.start_date_var, 
-                                   width=15, font=('Consolas', 11), 
+                                   width=15, font=self._font_mono, 
                                    validate="key", 
-                                   validatecommand=vcmd_start)
+                                   validatecommand=vcmd_date)
         start_date_entry.pack(side="left")
         self.start_date_entry = start_date_entry  # Store reference for placeholder functionality
-        self.start_date_validation_label = tb.Label(start_date_frame, text="", font=('Arial', 10))
+        self.start_date_validation_label = tb.Label(start_date_frame, text="", font=self._font_normal)
         self.start_date_validation_label.pack(side="left", padx=(5, 0))
         start_date_entry.bind('<KeyRelease>', lambda e: self.full_date_validation('start'))
-        start_date_entry.bind('<FocusOut>', lambda e: self.on_start_date_focus_out(e))
-        start_date_entry.bind('<FocusIn>', lambda e: self.on_start_date_focus_in(e))
+        start_date_entry.bind('<FocusOut>', self.on_start_date_focus_out)
+        start_date_entry.bind('<FocusIn>', self.on_start_date_focus_in)
         self.add_tooltip(start_date_entry, "Första datum för avsökning av mejl.")
         
         # End date with validation
         end_date_frame = tb.Frame(date_frame)
         end_date_frame.pack(side="left")
-        tb.Label(end_date_frame, text="Slutdatum:", font=('Arial', 10)).pack(anchor="w", pady=(0, 5))
-        vcmd_end = (self.root.register(self.validate_date_entry), '%P')
+        tb.Label(end_date_frame, text="Slutdatum:", font=self._font_normal).pack(anchor="w", pady=(0, 5))
         end_date_entry = tb.Entry(end_date_frame, textvariable=self.end_date_var, 
-                                 width=15, font=('Consolas', 11),
+                                 width=15, font=self._font_mono,
                                  validate="key", 
-                                 validatecommand=vcmd_end)
+                                 validatecommand=vcmd_date)
         end_date_entry.pack(side="left")
         self.end_date_entry = end_date_entry  # Store reference for placeholder functionality
-        self.end_date_validation_label = tb.Label(end_date_frame, text="", font=('Arial', 10))
+        self.end_date_validation_label = tb.Label(end_date_frame, text="", font=self._font_normal)
         self.end_date_validation_label.pack(side="left", padx=(5, 0))
+        # Last (text, foreground) set on each validation label
+        self._date_label_state = {"start": ("", None), "end": ("", None)}
         end_date_entry.bind('<KeyRelease>', lambda e: self.full_date_validation('end'))
-        end_date_entry.bind('<FocusOut>', lambda e: self.on_end_date_focus_out(e))
-        end_date_entry.bind('<FocusIn>', lambda e: self.on_end_date_focus_in(e))
+        end_date_entry.bind('<FocusOut>', self.on_end_date_focus_out)
+        end_date_entry.bind('<FocusIn>', self.on_end_date_focus_in)
         self.add_tooltip(end_date_entry, "Sista datum för avsökning av mejl. Om du bara är intresserad av en dag så lämna Slutdatum tomt.")
         
         # Date explanation
-        date_info_frame = tb.Frame(self.gmail_frame)
-        date_info_frame.pack(fill="x", pady=(0, 15))
-        
-        tb.Label(date_info_frame, text="Lämna slutdatum tomt om du bara vill hämta från ett specifikt datum", 
-                 font=('Arial', 9), foreground="lightblue").pack(anchor="w")
+        tb.Label(self.gmail_frame, text="Lämna slutdatum tomt om du bara vill hämta från ett specifikt datum", 
+                 font=self._font_small, foreground="lightblue").pack(anchor="w", pady=(0, 15))
         
         # Output directory
         gmail_output_frame = tb.Frame(self.gmail_frame)
         gmail_output_frame.pack(fill="x", pady=(0, 10))
         
         tb.Label(gmail_output_frame, text="Nedladdningsmapp: (Lämna tomt för automatisk mapp i Hämtade filer)",
-                 font=('Arial', 10)).pack(anchor="w", pady=(0, 5))
+                 font=self._font_normal).pack(anchor="w", pady=(0, 5))
         
         gmail_output_path_frame = tb.Frame(gmail_output_frame)
         gmail_output_path_frame.pack(fill="x")
         
         gmail_output_entry = tb.Entry(gmail_output_path_frame, textvariable=self.gmail_output_dir_var, 
-                                     font=('Arial', 10))
+                                     font=self._font_normal)
         gmail_output_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
         self.add_tooltip(gmail_output_entry, "Var ska bilagorna som laddas ned hamna?")
         
         browse_gmail_output_btn = tb.Button(gmail_output_path_frame, text="Välj mapp...", 
-                                           command=self.browse_gmail_output_dir, 
-                                           bootstyle=INFO, width=12)
+                                           command=self.browse_gmail_output_dir, **self._BROWSE_BUTTON_KW)
         browse_gmail_output_btn.pack(side="right")
         
         # Add clickable link to open download folder
         self.open_folder_link = tb.Label(gmail_output_frame, text="📂 Öppna mapp", 
-                                        font=('Arial', 9), foreground="green", 
+                                        font=self._font_small, foreground="green", 
                                         cursor="hand2")
         self.open_folder_link.pack(anchor="w", pady=(2, 0))
         self.open_folder_link.bind("<Button-1>", self.open_download_folder_event)
@@ -512,10 +569,10 @@ class CombinedApp:
 
         # Check format and validate date
         normalized = None
-        if re.match(r"^\d{4}-\d{2}-\d{2}$", input_str):
+        if _DATE_FULL_RE.match(input_str):
             # Already in correct format
             normalized = input_str
-        elif re.match(r"^\d{8}$", input_str):
+        elif _DATE_COMPACT_RE.match(input_str):
             # Convert YYYYMMDD to YYYY-MM-DD
             normalized = f"{input_str[:4]}-{input_str[4:6]}-{input_str[6:]}"
         else:
@@ -525,7 +582,7 @@ class CombinedApp:
 
         # Validate the actual date
         try:
-            datetime.datetime.strptime(normalized, "%Y-%m-%d")
+            datetime.date.fromisoformat(normalized)
             # Update the variable with normalized format
             if field == "start":
                 self.start_date_var.set(normalized)
@@ -539,29 +596,32 @@ class CombinedApp:
             self.update_date_validation_label(input_str, field, False)
             return False
 
+    def _set_date_label(self, field: str, text: str, foreground: str):
+        """Configure a date validation label, skipping the Tk call if nothing changes"""
+        state = (text, foreground)
+        if self._date_label_state[field] == state:
+            return
+        self._date_label_state[field] = state
+        label = self.start_date_validation_label if field == "start" else self.end_date_validation_label
+        label.config(text=text, foreground=foreground)
+
     def update_date_validation_label(self, input_str: str, field: str, is_format_valid: bool):
         """Update validation label for date fields"""
-        start_label = self.start_date_validation_label
-        end_label = self.end_date_validation_label
-        target_label = start_label if field == "start" else end_label
-
         # Clear if empty or placeholder
         if not input_str or input_str == self.placeholder_text:
-            target_label.config(text="", foreground="green")
+            self._set_date_label(field, "", "green")
             return
 
         # Show validation result
         if is_format_valid:
-            target_label.config(text="✓", foreground="green")
+            self._set_date_label(field, "✓", "green")
         else:
-            target_label.config(text="✗", foreground="red")
+            self._set_date_label(field, "✗", "red")
 
     def cross_validate_dates(self, updated_field: str) -> bool:
         """Cross-validate start and end dates"""
         start_date = self.start_date_var.get()
         end_date = self.end_date_var.get()
-        start_label = self.start_date_validation_label
-        end_label = self.end_date_validation_label
 
         # If either field is empty or contains placeholder text, just show format validation
         if (not start_date or start_date == self.placeholder_text or 
@@ -570,22 +630,22 @@ class CombinedApp:
 
         # Parse dates
         try:
-            start_dt = datetime.datetime.strptime(start_date, "%Y-%m-%d")
-            end_dt = datetime.datetime.strptime(end_date, "%Y-%m-%d")
+            # Dates are stored as YYYY-MM-DD, which fromisoformat parses without strptime's regex machinery
+            start_dt = datetime.date.fromisoformat(start_date)
+            end_dt = datetime.date.fromisoformat(end_date)
         except ValueError:
             return False
 
         # Check if start <= end
         if start_dt <= end_dt:
-            start_label.config(text="✓", foreground="green")
-            end_label.config(text="✓", foreground="green")
+            self._set_date_label("start", "✓", "green")
+            self._set_date_label("end", "✓", "green")
             return True
         else:
             # Mark the inconsistent field
-            invalid_label = start_label if updated_field == "start" else end_label
-            valid_label = end_label if updated_field == "start" else start_label
-            invalid_label.config(text="✗", foreground="red")
-            valid_label.config(text="✓", foreground="green")
+            other_field = "end" if updated_field == "start" else "start"
+            self._set_date_label(updated_field, "✗", "red")
+            self._set_date_label(other_field, "✓", "green")
             return False
     
     def on_start_date_focus_in(self, event):
@@ -637,61 +697,53 @@ class CombinedApp:
         kb_input_frame = tb.Frame(self.kb_frame)
         kb_input_frame.pack(fill="x", pady=(0, 15))
         
-        tb.Label(kb_input_frame, text="Mapp där jpg-filerna finns:", font=('Arial', 10)).pack(anchor="w", pady=(0, 5))
+        tb.Label(kb_input_frame, text="Mapp där jpg-filerna finns:", font=self._font_normal).pack(anchor="w", pady=(0, 5))
         
         kb_input_path_frame = tb.Frame(kb_input_frame)
         kb_input_path_frame.pack(fill="x")
         
         self.kb_input_entry = tb.Entry(kb_input_path_frame, textvariable=self.kb_input_dir_var, 
-                                      font=('Arial', 10))
+                                      font=self._font_normal)
         self.kb_input_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
         self.add_tooltip(self.kb_input_entry, "Om du både laddar ned bilagor och konverterar dem till pdf så är denna mapp samma som Nedladdningsmappen. Om du däremot vill konvertera bib-filer som redan finns på hårddisken, så stäng av nedladdningsfunktionen överst i appfönstret. Då kan du här själv tala om i vilken mapp dina bib-jpg:er ligger.")
         
         self.browse_kb_input_btn = tb.Button(kb_input_path_frame, text="Bläddra...", 
-                                            command=self.browse_kb_input_dir, 
-                                            bootstyle=INFO, width=12)
+                                            command=self.browse_kb_input_dir, **self._BROWSE_BUTTON_KW)
         self.browse_kb_input_btn.pack(side="right")
         
         # Auto-link info
         self.kb_auto_info = tb.Label(kb_input_frame, 
                                     text="📁 Om båda verktygen körs så används automatiskt nedladdningsmappen.",
-                                    font=('Arial', 9), foreground="lightgreen")
+                                    font=self._font_small, foreground="lightgreen")
         
         # Output directory
         kb_output_frame = tb.Frame(self.kb_frame)
         kb_output_frame.pack(fill="x", pady=(0, 15))
         
-        tb.Label(kb_output_frame, text="Var ska pdf:erna sparas?", font=('Arial', 10)).pack(anchor="w", pady=(0, 5))
+        tb.Label(kb_output_frame, text="Var ska pdf:erna sparas?", font=self._font_normal).pack(anchor="w", pady=(0, 5))
         
         # Same directory switch
-        same_dir_frame = tb.Frame(kb_output_frame)
-        same_dir_frame.pack(fill="x", pady=(0, 10))
-        
-        self.same_dir_check = tb.Checkbutton(same_dir_frame, text="Använd mappen där jpg-filerna finns", 
+        self.same_dir_check = tb.Checkbutton(kb_output_frame, text="Använd mappen där jpg-filerna finns", 
                                            variable=self.use_same_output_dir_var, 
                                            bootstyle="info-round-toggle")
-        self.same_dir_check.pack(anchor="w")
+        self.same_dir_check.pack(anchor="w", pady=(0, 10))
         
         kb_output_path_frame = tb.Frame(kb_output_frame)
         kb_output_path_frame.pack(fill="x")
         
         self.kb_output_entry = tb.Entry(kb_output_path_frame, textvariable=self.kb_output_dir_var, 
-                                       font=('Arial', 10))
+                                       font=self._font_normal)
         self.kb_output_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
         self.add_tooltip(self.kb_output_entry, "Här kan du välja var pdf:er som appen skapar ska sparas.")
         
         self.browse_kb_output_btn = tb.Button(kb_output_path_frame, text="Bläddra...", 
-                                             command=self.browse_kb_output_dir, 
-                                             bootstyle=INFO, width=12)
+                                             command=self.browse_kb_output_dir, **self._BROWSE_BUTTON_KW)
         self.browse_kb_output_btn.pack(side="right")
         
         # Keep renamed files checkbox (moved under output directory)
-        keep_frame = tb.Frame(self.kb_frame)
-        keep_frame.pack(fill="x", pady=(0, 10))
-        
         # Create a frame for the checkbox, text and help button
-        checkbox_frame = tb.Frame(keep_frame)
-        checkbox_frame.pack(anchor="w")
+        checkbox_frame = tb.Frame(self.kb_frame)
+        checkbox_frame.pack(anchor="w", pady=(0, 10))
         
         # Create the checkbox with text
         keep_renamed_checkbox = tb.Checkbutton(checkbox_frame, text="Spara omdöpta jpg-filer i en underkatalog?", 
@@ -701,18 +753,14 @@ class CombinedApp:
         self.add_tooltip(keep_renamed_checkbox, "Om du kryssar i den här rutan så sparas alla omdöpta jpg-filer i underkatalogen 'Jpg-filer med fina namn'. Som standard raderas jpg-filerna.")
         
         # Create help button with question mark
-        help_btn = tb.Button(checkbox_frame, text="?", width=3, 
-                            command=self.show_keep_renamed_help,
-                            bootstyle="info-outline")
+        help_btn = tb.Button(checkbox_frame, command=self.show_keep_renamed_help,
+                             **self._HELP_BUTTON_KW)
         help_btn.pack(side="left", padx=(10, 0))
         
         # Delete original files option (moved to last position)
-        delete_files_frame = tb.Frame(self.kb_frame)
-        delete_files_frame.pack(fill="x", pady=(10, 15))
-        
         # Create a frame for the checkbox, text and help button
-        delete_checkbox_frame = tb.Frame(delete_files_frame)
-        delete_checkbox_frame.pack(anchor="w")
+        delete_checkbox_frame = tb.Frame(self.kb_frame)
+        delete_checkbox_frame.pack(anchor="w", pady=(10, 15))
         
         # Create the checkbox with text
         delete_checkbox = tb.Checkbutton(delete_checkbox_frame, text="Bevara bib-filerna från KB efter konvertering? (Rekommenderas ej)", 
@@ -722,17 +770,13 @@ class CombinedApp:
         self.add_tooltip(delete_checkbox, "Du kan spara originalfilerna som appen laddar ned från KB. Det är jpg-filer namngivna med bib-koder. Svårt att förstå varför någon skulle vilja göra det.")
         
         # Create help button with question mark
-        delete_help_btn = tb.Button(delete_checkbox_frame, text="?", width=3, 
-                                   command=self.show_delete_files_help,
-                                   bootstyle="info-outline")
+        delete_help_btn = tb.Button(delete_checkbox_frame, command=self.show_delete_files_help,
+                                    **self._HELP_BUTTON_KW)
         delete_help_btn.pack(side="left", padx=(10, 0))
         
         # Use alias checkbox
-        alias_frame = tb.Frame(self.kb_frame)
-        alias_frame.pack(fill="x", pady=(10, 0))
-
-        alias_checkbox_frame = tb.Frame(alias_frame)
-        alias_checkbox_frame.pack(anchor="w")
+        alias_checkbox_frame = tb.Frame(self.kb_frame)
+        alias_checkbox_frame.pack(anchor="w", pady=(10, 0))
 
         self.use_alias_checkbox = tb.Checkbutton(
             alias_checkbox_frame, text="Använd kortnamn (alias) i filnamn",
@@ -746,18 +790,18 @@ class CombinedApp:
         # Alias status label
         self.alias_status_var = tk.StringVar(value="")
         self.alias_status_label = tb.Label(alias_checkbox_frame, textvariable=self.alias_status_var,
-                                           font=('Arial', 9), foreground="gray")
+                                           font=self._font_small, foreground="gray")
         self.alias_status_label.pack(side="left", padx=(10, 0))
 
         # CSV status information (moved to bottom)
         csv_frame = tb.Frame(self.kb_frame)
         csv_frame.pack(fill="x", pady=(20, 0))
         
-        tb.Label(csv_frame, text="Bib-kod översättning:", font=('Arial', 10, 'bold')).pack(anchor="w", pady=(0, 5))
+        tb.Label(csv_frame, text="Bib-kod översättning:", font=self._font_bold).pack(anchor="w", pady=(0, 5))
         
         # CSV status label
         self.csv_status_label = tb.Label(csv_frame, textvariable=self.csv_status_var, 
-                                        font=('Arial', 10), foreground="gray")
+                                        font=self._font_normal, foreground="gray")
         self.csv_status_label.pack(anchor="w")
         self.add_tooltip(self.csv_status_label, "CSV-filen 'titles_bibids_ÅÅÅÅ-MM-DD.csv' söks automatiskt i programmappen när KB-funktionen aktiveras.")
     
@@ -783,7 +827,7 @@ class CombinedApp:
         # Progress frame
         self.progress_frame = tb.Frame(action_frame)
         self.progress_label = tb.Label(self.progress_frame, textvariable=self.progress_message_var, 
-                                      font=("Arial", 10), wraplength=550, justify="left")
+                                      font=self._font_normal, wraplength=550, justify="left")
         self.progress_label.pack(pady=(8, 0))
         
         self.progress_bar = tb.Progressbar(self.progress_frame, length=600, mode='determinate')
@@ -791,7 +835,7 @@ class CombinedApp:
     
     def create_status_section(self, parent):
         """Create status section"""
-        status_label = tb.Label(parent, textvariable=self.status_var, font=('Arial', 10))
+        status_label = tb.Label(parent, textvariable=self.status_var, font=self._font_normal)
         status_label.pack(pady=(15, 0))
     
     def show_about(self):
@@ -926,21 +970,28 @@ class CombinedApp:
     
     def open_manual(self):
         """Open Manual.pdf with the default application"""
-        manual_path = get_app_directory() / "Manual.pdf"
+        manual_path = self._manual_path
         if not manual_path.exists():
             messagebox.showerror("Fel", f"Manual.pdf hittades inte i programmets mapp.\nSökte i: {manual_path}")
             return
-        try:
-            if sys.platform.startswith('win'):
-                # Use os.startfile instead of subprocess for better Windows compatibility
-                import os
-                os.startfile(str(manual_path))
-            elif sys.platform.startswith('darwin'):
-                self.secure_ops.safe_subprocess_run(['open'], file_arg=str(manual_path))
-            else:
-                self.secure_ops.safe_subprocess_run(['xdg-open'], file_arg=str(manual_path))
-        except Exception as e:
-            messagebox.showerror("Fel", f"Kunde inte öppna Manual.pdf: {e}")
+        
+        def open_worker():
+            try:
+                if _IS_WIN:
+                    # Use os.startfile instead of subprocess for better Windows compatibility
+                    os.startfile(str(manual_path))
+                elif sys.platform.startswith('darwin'):
+                    self.secure_ops.safe_subprocess_run(['open'], file_arg=str(manual_path))
+                else:
+                    self.secure_ops.safe_subprocess_run(['xdg-open'], file_arg=str(manual_path))
+            except Exception as e:
+                def show_error(error=e):
+                    messagebox.showerror("Fel", f"Kunde inte öppna Manual.pdf: {error}")
+                self.root.after(0, show_error)
+        
+        # Starting the viewer goes through the shell's file associations, which can
+        # block for a noticeable time - keep the GUI responsive meanwhile
+        threading.Thread(target=open_worker, daemon=True).start()
 
     def toggle_auto_check(self):
         """Toggle automatic update checking setting"""
@@ -1023,7 +1074,7 @@ class CombinedApp:
             """Background thread for update checking"""
             try:
                 # Update status in main thread
-                self.root.after(0, lambda: self.update_status("Söker efter uppdateringar..."))
+                self.root.after(0, self.update_status, "Söker efter uppdateringar...")
                 
                 # Get repository configuration from settings
                 update_settings = self.config.get("update_settings", {})
@@ -1037,7 +1088,7 @@ class CombinedApp:
                         "GitHub repository är inte konfigurerat.\n" +
                         "Kontakta utvecklaren för konfigurationsinställningar."
                     ))
-                    self.root.after(0, lambda: self.update_status(""))
+                    self.root.after(0, self.update_status, "")
                     return
                 
                 # Create version checker and perform check
@@ -1101,7 +1152,8 @@ class CombinedApp:
     
     def on_gmail_toggle(self, *args):
         """Handle Gmail checkbox toggle"""
-        self.update_ui_state()
+        if not self._loading_config:
+            self.update_ui_state()
         if not GMAIL_AVAILABLE and self.gmail_enabled.get():
             messagebox.showwarning("Gmail ej tillgängligt", 
                                  "Google API-biblioteken är inte installerade.\n" +
@@ -1110,7 +1162,8 @@ class CombinedApp:
     
     def on_kb_toggle(self, *args):
         """Handle KB checkbox toggle"""
-        self.update_ui_state()
+        if not self._loading_config:
+            self.update_ui_state()
         if not IMAGE_PROCESSING_AVAILABLE and self.kb_enabled.get():
             messagebox.showwarning("KB-bearbetning ej tillgänglig", 
                                  "PIL eller pandas är inte installerade.\n" +
@@ -1165,18 +1218,27 @@ class CombinedApp:
         kb_on = self.kb_enabled.get()
         both_on = gmail_on and kb_on
         
-        # Always show Gmail section first if enabled, then KB section
-        # First, hide both sections to reset order
-        self.gmail_frame.pack_forget()
-        self.kb_frame.pack_forget()
+        # Always show Gmail section first if enabled, then KB section.
+        # Only sections whose visibility changed are packed/unpacked - each pack
+        # change makes Tk lay out the window again
+        was_gmail, was_kb = self._packed_sections
+        if gmail_on and not was_gmail and was_kb:
+            # Gmail must come before KB - re-pack KB after it
+            self.kb_frame.pack_forget()
+            was_kb = False
+        if was_gmail and not gmail_on:
+            self.gmail_frame.pack_forget()
+        if was_kb and not kb_on:
+            self.kb_frame.pack_forget()
         
         # Show Gmail section first if enabled
-        if gmail_on:
+        if gmail_on and not was_gmail:
             self.gmail_frame.pack(fill="x", pady=(0, 10))
         
         # Show KB section after Gmail if enabled
-        if kb_on:
+        if kb_on and not was_kb:
             self.kb_frame.pack(fill="x", pady=(0, 10))
+        self._packed_sections = (gmail_on, kb_on)
         
         # Show auto-link info when both are enabled
         if both_on:
@@ -1218,12 +1280,15 @@ class CombinedApp:
     
     def load_config_to_gui(self):
         """Load saved configuration to GUI"""
+        cfg_get = self.config.get
+        # Toggle traces would redo the whole UI state for every variable set below
+        self._loading_config = True
         # Always start with both tools enabled, regardless of saved config
         self.gmail_enabled.set(True)
         self.kb_enabled.set(True)
-        self.gmail_account_var.set(self.config.get("gmail_account", ""))
-        self.credentials_file_var.set(self.config.get("credentials_file", "Ingen fil vald"))
-        self.sender_var.set(self.config.get("sender_email", "noreply@kb.se"))
+        self.gmail_account_var.set(cfg_get("gmail_account", ""))
+        self.credentials_file_var.set(cfg_get("credentials_file", "Ingen fil vald"))
+        self.sender_var.set(cfg_get("sender_email", "noreply@kb.se"))
         
         # Always start with empty date fields (dates should not persist between sessions)
         # This ensures users start fresh each time
@@ -1233,9 +1298,9 @@ class CombinedApp:
         self.end_date_var.set(self.placeholder_text)
         self.end_date_has_placeholder = True
         # Only show folder path if it actually exists, otherwise start empty
-        config_path = self.config.get("gmail_output_dir", "")
-        if config_path and Path(config_path).exists():
-            self.gmail_output_dir_var.set(config_path)
+        gmail_output_dir = cfg_get("gmail_output_dir", "")
+        if gmail_output_dir and Path(gmail_output_dir).exists():
+            self.gmail_output_dir_var.set(gmail_output_dir)
         else:
             self.gmail_output_dir_var.set("")  # Start with empty field - user will see informative label
 
@@ -1244,28 +1309,29 @@ class CombinedApp:
         # CSV file is now auto-detected, no need to load from config
         
         # Only load KB input dir if not both tools are enabled
-        if not (self.config.get("gmail_enabled", False) and self.config.get("kb_enabled", False)):
-            self.kb_input_dir_var.set(self.config.get("kb_input_dir", ""))
+        if not (cfg_get("gmail_enabled", False) and cfg_get("kb_enabled", False)):
+            self.kb_input_dir_var.set(cfg_get("kb_input_dir", ""))
         else:
             self.kb_input_dir_var.set("")  # Clear if both tools enabled
         
         # Set KB output dir to same as Gmail output dir by default
-        default_kb_output = self.config.get("kb_output_dir", "")
+        default_kb_output = cfg_get("kb_output_dir", "")
         if not default_kb_output:
-            default_kb_output = self.config.get("gmail_output_dir", "")  # Use Gmail dir or empty if not set
+            default_kb_output = gmail_output_dir  # Use Gmail dir or empty if not set
         self.kb_output_dir_var.set(default_kb_output)
         # Always start with keep_renamed disabled (default OFF)
         self.keep_renamed_var.set(False)
         
         # Load use_same_output_dir setting (default True)
-        self.use_same_output_dir_var.set(self.config.get("use_same_output_dir", True))
+        self.use_same_output_dir_var.set(cfg_get("use_same_output_dir", True))
         
         # Always start with delete_original_files disabled (don't save this setting)
         self.delete_original_files_var.set(False)
 
         # Load use_alias setting (default True)
-        self.use_alias_var.set(self.config.get("use_alias", True))
+        self.use_alias_var.set(cfg_get("use_alias", True))
 
+        self._loading_config = False
         self.update_ui_state()
 
         # Load update check setting
@@ -1296,42 +1362,44 @@ class CombinedApp:
         if end_date == self.placeholder_text:
             end_date = ""
         
-        self.config.update({
-            "gmail_enabled": self.gmail_enabled.get(),
-            "kb_enabled": self.kb_enabled.get(),
-            "gmail_account": self.gmail_account_var.get(),
-            "credentials_file": self.credentials_file_var.get(),
-            "sender_email": self.sender_var.get(),
-            "start_date": start_date,
-            "end_date": end_date,
-            "gmail_output_dir": self.gmail_output_dir_var.get(),
-            # excel_path removed - CSV is auto-detected
-            "kb_input_dir": self.kb_input_dir_var.get(),
-            "kb_output_dir": self.kb_output_dir_var.get(),
-            "keep_renamed": self.keep_renamed_var.get(),
-            "use_same_output_dir": self.use_same_output_dir_var.get(),
-            "use_alias": self.use_alias_var.get()
-            # Note: delete_original_files is not saved - always defaults to True at startup
-        })
-        save_config(self.config)
+        cfg = self.config
+        cfg["gmail_enabled"] = self.gmail_enabled.get()
+        cfg["kb_enabled"] = self.kb_enabled.get()
+        cfg["gmail_account"] = self.gmail_account_var.get()
+        cfg["credentials_file"] = self.credentials_file_var.get()
+        cfg["sender_email"] = self.sender_var.get()
+        cfg["start_date"] = start_date
+        cfg["end_date"] = end_date
+        cfg["gmail_output_dir"] = self.gmail_output_dir_var.get()
+        # excel_path removed - CSV is auto-detected
+        cfg["kb_input_dir"] = self.kb_input_dir_var.get()
+        cfg["kb_output_dir"] = self.kb_output_dir_var.get()
+        cfg["keep_renamed"] = self.keep_renamed_var.get()
+        cfg["use_same_output_dir"] = self.use_same_output_dir_var.get()
+        cfg["use_alias"] = self.use_alias_var.get()
+        # Note: delete_original_files is not saved - always defaults to True at startup
+        save_config(cfg)
+    
+    def _dialog_initialdir(self, current: str = ""):
+        """Start a browse dialog in the field's folder, else the last picked folder, else the app folder"""
+        return current.strip() or self._last_browse_dir or self._app_dir
     
     def browse_credentials_file(self):
         """Browse for credentials file"""
         file_path = filedialog.askopenfilename(
             title="Välj Gmail API Credentials-fil",
             filetypes=[("JSON-filer", "*.json"), ("Alla filer", "*.*")],
-            initialdir=get_app_directory()
+            initialdir=self._dialog_initialdir(os.path.dirname(self.credentials_file_var.get()))
         )
         if file_path:
+            self._last_browse_dir = os.path.dirname(file_path)
             try:
-                import json
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    if 'installed' in data or 'web' in data:
-                        self.credentials_file_var.set(file_path)
-                    else:
-                        messagebox.showerror("Ogiltig fil", 
-                                           "Den valda filen verkar inte vara en giltig Google API credentials-fil.")
+                data = _json_loads(Path(file_path).read_bytes())
+                if isinstance(data, dict) and ('installed' in data or 'web' in data):
+                    self.credentials_file_var.set(file_path)
+                else:
+                    messagebox.showerror("Ogiltig fil", 
+                                       "Den valda filen verkar inte vara en giltig Google API credentials-fil.")
             except Exception as e:
                 messagebox.showerror("Fel", f"Kunde inte läsa filen: {str(e)}")
     
@@ -1339,9 +1407,10 @@ class CombinedApp:
         """Browse for Gmail output directory"""
         directory = filedialog.askdirectory(
             title="Välj mapp för Gmail-nedladdning",
-            initialdir=self.gmail_output_dir_var.get()
+            initialdir=self._dialog_initialdir(self.gmail_output_dir_var.get())
         )
         if directory:
+            self._last_browse_dir = directory
             self.gmail_output_dir_var.set(directory)
             # Update folder link visibility after user selects folder
             self.update_folder_link_visibility()
@@ -1364,24 +1433,30 @@ class CombinedApp:
                                f"Den valda mappen finns inte:\n{folder_path}")
             return
 
-        try:
-            if sys.platform.startswith('win'):
-                # Windows: Use explorer
-                subprocess.run(['explorer', os.path.normpath(folder_path)],
-                              capture_output=True, text=True)
-                logger.info(f"Opened download folder (Windows): {folder_path}")
-            elif sys.platform.startswith('darwin'):
-                # macOS: Use open command
-                self.secure_ops.safe_subprocess_run(['open'], file_arg=str(folder_path))
-                logger.info(f"Opened download folder (macOS): {folder_path}")
-            else:
-                # Linux: Use xdg-open
-                self.secure_ops.safe_subprocess_run(['xdg-open'], file_arg=str(folder_path))
-                logger.info(f"Opened download folder (Linux): {folder_path}")
-        except Exception as e:
-            logger.error(f"Unexpected error opening folder {folder_path}: {e}")
-            messagebox.showerror("Oväntat fel",
-                               f"Ett oväntat fel inträffade när mappen skulle öppnas.\n\nFel: {str(e)}")
+        def open_worker():
+            try:
+                if _IS_WIN:
+                    # Windows: Use explorer
+                    subprocess.run(['explorer', os.path.normpath(folder_path)],
+                                  capture_output=True, text=True)
+                    logger.info(f"Opened download folder (Windows): {folder_path}")
+                elif sys.platform.startswith('darwin'):
+                    # macOS: Use open command
+                    self.secure_ops.safe_subprocess_run(['open'], file_arg=str(folder_path))
+                    logger.info(f"Opened download folder (macOS): {folder_path}")
+                else:
+                    # Linux: Use xdg-open
+                    self.secure_ops.safe_subprocess_run(['xdg-open'], file_arg=str(folder_path))
+                    logger.info(f"Opened download folder (Linux): {folder_path}")
+            except Exception as e:
+                logger.error(f"Unexpected error opening folder {folder_path}: {e}")
+                def show_error(error=e):
+                    messagebox.showerror("Oväntat fel",
+                                       f"Ett oväntat fel inträffade när mappen skulle öppnas.\n\nFel: {str(error)}")
+                self.root.after(0, show_error)
+        
+        # explorer/xdg-open may take a while to return - don't block the GUI
+        threading.Thread(target=open_worker, daemon=True).start()
 
     def update_folder_link_visibility(self):
         """Update the 'Open folder' link visibility based on folder existence"""
@@ -1396,8 +1471,7 @@ class CombinedApp:
 
     def find_and_validate_csv(self):
         """Find and validate CSV file automatically"""
-        from pathlib import Path
-        app_dir = Path(get_app_directory())
+        app_dir = self._app_dir
 
         # Try to find CSV file
         csv_file = self.kb_processor.csv_handler.find_csv_file(app_dir)
@@ -1432,13 +1506,13 @@ class CombinedApp:
 
     def browse_for_csv_file(self):
         """Allow user to manually select CSV file if auto-detection fails"""
-        from pathlib import Path
         file_path = filedialog.askopenfilename(
             title="Välj CSV-fil med bib-kod översättning",
             filetypes=[("CSV-filer", "*.csv"), ("Alla filer", "*.*")],
-            initialdir=get_app_directory()
+            initialdir=self._dialog_initialdir()
         )
         if file_path:
+            self._last_browse_dir = os.path.dirname(file_path)
             csv_path = Path(file_path)
             success, message, count = self.kb_processor.csv_handler.load_csv_file(csv_path)
             if success:
@@ -1455,18 +1529,20 @@ class CombinedApp:
         """Browse for KB input directory"""
         directory = filedialog.askdirectory(
             title="Välj mapp med KB JPG-filer",
-            initialdir=get_app_directory()
+            initialdir=self._dialog_initialdir(self.kb_input_dir_var.get())
         )
         if directory:
+            self._last_browse_dir = directory
             self.kb_input_dir_var.set(directory)
     
     def browse_kb_output_dir(self):
         """Browse for KB output directory"""
         directory = filedialog.askdirectory(
             title="Välj mapp för PDF-utdata",
-            initialdir=get_app_directory()
+            initialdir=self._dialog_initialdir(self.kb_output_dir_var.get())
         )
         if directory:
+            self._last_browse_dir = directory
             self.kb_output_dir_var.set(directory)
     
     def validate_settings(self):
@@ -1481,19 +1557,20 @@ class CombinedApp:
         
         # Validate Gmail settings
         if gmail_on:
+            placeholder = self.placeholder_text
+            date_state = self._date_label_state
+            credentials_file = self.credentials_file_var.get().strip()
+            start_date_value = self.start_date_var.get().strip()
+            end_date_value = self.end_date_var.get().strip()
             if not self.gmail_account_var.get().strip():
                 errors.append("Gmail-konto måste anges")
-            if self.credentials_file_var.get() == "Ingen fil vald" or not self.credentials_file_var.get().strip():
+            if not credentials_file or credentials_file == "Ingen fil vald":
                 errors.append("Credentials-fil måste väljas")
-            start_date_value = self.start_date_var.get().strip()
-            if not start_date_value or start_date_value == self.placeholder_text:
+            if not start_date_value or start_date_value == placeholder:
                 errors.append("Startdatum måste anges")
-            if (start_date_value and start_date_value != self.placeholder_text and 
-                self.start_date_validation_label.cget("text") != "✓"):
+            elif date_state["start"][0] != "✓":
                 errors.append("Startdatum är ogiltigt eller inkonsekvent med slutdatum")
-            end_date_value = self.end_date_var.get().strip()
-            if (end_date_value and end_date_value != self.placeholder_text and
-                self.end_date_validation_label.cget("text") != "✓"):
+            if end_date_value and end_date_value != placeholder and date_state["end"][0] != "✓":
                 errors.append("Slutdatum är ogiltigt eller inkonsekvent med startdatum")
             # Removed empty field check - folder will be auto-created if empty
         
@@ -1638,12 +1715,28 @@ class CombinedApp:
     
     def update_progress(self, message: str, progress: int):
         """Update progress bar and message - thread-safe"""
+        # Coalesce bursts of updates: while a GUI update is already queued, only the
+        # values it will show are replaced
+        with self._progress_lock:
+            already_queued = self._pending_progress is not None
+            self._pending_progress = (message, progress)
+        if already_queued:
+            return
         try:
             # Schedule GUI update on main thread
-            self.root.after(0, self._update_progress_safe, message, progress)
+            self.root.after(0, self._flush_progress)
         except tk.TclError:
-            # GUI might have been destroyed
-            pass
+            # GUI might have been destroyed - don't leave an update marked as queued
+            with self._progress_lock:
+                self._pending_progress = None
+    
+    def _flush_progress(self):
+        """Show the latest queued progress - runs on the main thread"""
+        with self._progress_lock:
+            pending = self._pending_progress
+            self._pending_progress = None
+        if pending:
+            self._update_progress_safe(*pending)
     
     def _update_progress_safe(self, message: str, progress: int):
         """Internal method to safely update progress from main thread"""
@@ -1732,22 +1825,23 @@ class CombinedApp:
     
     def clear_progress_text(self):
         """Clear progress text completely using a more robust method"""
+        # update_idletasks() flushes the pending redraws without re-entering the event loop
         try:
             # Method 1: Set to a unique placeholder then clear
             placeholder = "█" * 50  # Use a unique string that's unlikely to match existing text
             self.progress_message_var.set(placeholder)
-            self.progress_label.update()
+            self.progress_label.update_idletasks()
             self.progress_message_var.set("")
-            self.progress_label.update()
+            self.progress_label.update_idletasks()
             
             # Method 2: Force widget reconfiguration
             self.progress_label.config(text="")
-            self.progress_label.update()
+            self.progress_label.update_idletasks()
             
             # Method 3: Temporarily hide and show the label to force refresh
             self.progress_label.pack_forget()
             self.progress_label.pack(pady=(8, 0))
-            self.progress_label.update()
+            self.progress_label.update_idletasks()
         except tk.TclError:
             # GUI might have been destroyed
             pass
@@ -1761,7 +1855,9 @@ class CombinedApp:
         self.kb_processor.cancel_operation()
         
         self.status_var.set("Avbryter...")
-        self.root.update()
+        # Only flush the redraw - a full update() would also run queued user events
+        # (e.g. another click) from inside this handler
+        self.root.update_idletasks()
     
     def start_processing(self):
         """Start the processing workflow"""
@@ -1790,15 +1886,36 @@ class CombinedApp:
         # Clear any previous progress text completely
         self.clear_progress_text()
         
+        # Read all settings here - Tk variables must only be touched from the main thread
+        settings = {
+            "gmail_on": self.gmail_enabled.get(),
+            "kb_on": self.kb_enabled.get(),
+            "credentials_file": self.credentials_file_var.get(),
+            "gmail_account": self.gmail_account_var.get(),
+            "sender_email": self.sender_var.get(),
+            "start_date": self.start_date_var.get(),
+            "end_date": self.end_date_var.get(),
+            "gmail_output_dir": self.gmail_output_dir_var.get(),
+            "kb_input_dir": self.kb_input_dir_var.get(),
+            "kb_output_dir": self.kb_output_dir_var.get(),
+            "use_same_output_dir": self.use_same_output_dir_var.get(),
+            "keep_renamed": self.keep_renamed_var.get(),
+            "keep_originals": self.delete_original_files_var.get(),
+            "use_alias": self.use_alias_var.get(),
+            "pdf_max_page_size": self.config.get("pdf_max_page_size"),
+        }
+        
         # Start processing in background thread
-        self.processing_thread = threading.Thread(target=self.run_processing_workflow, daemon=True)
+        self.processing_thread = threading.Thread(target=self.run_processing_workflow,
+                                                  args=(settings,), daemon=True)
         self.processing_thread.start()
     
-    def run_processing_workflow(self):
+    def run_processing_workflow(self, settings):
         """Run the actual processing workflow in background thread"""
-        gmail_on = self.gmail_enabled.get()
-        kb_on = self.kb_enabled.get()
+        gmail_on = settings["gmail_on"]
+        kb_on = settings["kb_on"]
         both_on = gmail_on and kb_on
+        kb_input_dir = settings["kb_input_dir"]
         
         try:
             gmail_result = None
@@ -1810,10 +1927,11 @@ class CombinedApp:
                 self.update_status("Fas 1: Gmail nedladdning...")
                 logger.info("Starting Gmail download phase")
                 
-                # Initialize Gmail downloader
+                # Initialize Gmail downloader - imported here to keep the Google client out of startup
+                from ..gmail.downloader import GmailDownloader
                 self.gmail_downloader = GmailDownloader(
-                    credentials_file=self.credentials_file_var.get(),
-                    gmail_account=self.gmail_account_var.get()
+                    credentials_file=settings["credentials_file"],
+                    gmail_account=settings["gmail_account"]
                 )
                 self.gmail_downloader.set_root(self.root)  # Set root for dialogs
                 self.gmail_downloader.set_icon_callback(self.set_window_icon)  # Set icon callback for dialogs
@@ -1835,8 +1953,8 @@ class CombinedApp:
                 # Download attachments
                 self.update_progress("Laddar ner bilagor...", 20)
                 # Convert placeholder text to empty string for processing
-                start_date = self.start_date_var.get()
-                end_date = self.end_date_var.get()
+                start_date = settings["start_date"]
+                end_date = settings["end_date"]
                 if start_date == self.placeholder_text:
                     start_date = ""
                 if end_date == self.placeholder_text:
@@ -1862,10 +1980,10 @@ class CombinedApp:
                     return result[0]
                 
                 gmail_result = self.gmail_downloader.download_attachments(
-                    sender_email=self.sender_var.get(),
+                    sender_email=settings["sender_email"],
                     start_date=start_date,
                     end_date=end_date,
-                    output_dir=self.gmail_output_dir_var.get(),
+                    output_dir=settings["gmail_output_dir"],
                     progress_callback=self.update_progress,
                     gui_update_callback=self.gui_update,
                     confirmation_callback=confirmation_callback
@@ -1877,17 +1995,14 @@ class CombinedApp:
                 
                 if gmail_result.get("user_cancelled"):
                     logger.info("User cancelled download via confirmation dialog")
-                    # Clean up and reset UI 
-                    self.progress_frame.pack_forget()
-                    self.start_btn.config(state="normal")
-                    self.cancel_btn.config(state="disabled")
+                    # Clean up and reset UI on the main thread
                     self.gmail_running = False
                     self.kb_running = False
-                    self.update_status("Avbruten av användare")
+                    self.root.after(0, self._reset_after_user_cancel)
                     return
                 
                 self.gmail_running = False
-                logger.info(f"Gmail download completed: {gmail_result}")
+                logger.info("Gmail download completed: %s", gmail_result)
 
                 if gmail_result.get('downloaded', 0) == 0:
                     # Schedule no emails found handling on main thread
@@ -1896,8 +2011,9 @@ class CombinedApp:
 
                 if both_on:
                     # Auto-link: set KB input to Gmail output
-                    self.kb_input_dir_var.set(gmail_result["output_path"])
-                    logger.info(f"Auto-linking KB input to Gmail output: {gmail_result['output_path']}")
+                    kb_input_dir = gmail_result["output_path"]
+                    self.root.after(0, self.kb_input_dir_var.set, kb_input_dir)
+                    logger.info("Auto-linking KB input to Gmail output: %s", gmail_result["output_path"])
             
             # Phase 2: KB Processing
             if kb_on:
@@ -1905,9 +2021,24 @@ class CombinedApp:
                 self.update_status("Fas 2: KB filbearbetning...")
                 logger.info("Starting KB processing phase")
                 
-                # Set root for KB processor dialogs
-                self.kb_processor.set_root(self.root)
-                self.kb_processor.set_icon_callback(self.set_window_icon)  # Set icon callback for dialogs
+                # Create thread-safe PDF conflict callback
+                def conflict_callback(pdf_name):
+                    result = ["cancel"]  # Using list to capture result in closure
+                    event = threading.Event()
+                    
+                    def show_dialog():
+                        try:
+                            result[0] = self._show_pdf_conflict_dialog(pdf_name)
+                        except Exception as e:
+                            logger.error(f"Error in PDF conflict dialog: {e}")
+                            result[0] = "cancel"
+                        finally:
+                            event.set()
+                    
+                    # Schedule on main thread and wait for result
+                    self.root.after(0, show_dialog)
+                    event.wait()  # Block until dialog is closed
+                    return result[0]
                 
                 # Determine progress offset (50% if Gmail ran, 0% if KB only)
                 progress_offset = 50 if gmail_on else 0
@@ -1917,19 +2048,21 @@ class CombinedApp:
                     self.update_progress(message, adjusted_progress)
                 
                 # Determine output directory
-                output_dir = self.kb_output_dir_var.get()
-                if self.use_same_output_dir_var.get():
-                    output_dir = self.kb_input_dir_var.get()
+                output_dir = settings["kb_output_dir"]
+                if settings["use_same_output_dir"]:
+                    output_dir = kb_input_dir
 
                 kb_result = self.kb_processor.process_files(
                     csv_path=self.csv_file_path,
-                    input_dir=self.kb_input_dir_var.get(),
+                    input_dir=kb_input_dir,
                     output_dir=output_dir,
-                    keep_renamed=self.keep_renamed_var.get(),
-                    keep_originals=self.delete_original_files_var.get(),
-                    use_alias=self.use_alias_var.get(),
+                    keep_renamed=settings["keep_renamed"],
+                    keep_originals=settings["keep_originals"],
+                    use_alias=settings["use_alias"],
                     progress_callback=kb_progress_callback,
-                    gui_update_callback=self.gui_update
+                    gui_update_callback=self.gui_update,
+                    conflict_callback=conflict_callback,
+                    max_page_size=settings["pdf_max_page_size"]
                 )
                 
                 if kb_result.get("cancelled"):
@@ -1937,7 +2070,7 @@ class CombinedApp:
                     return
                 
                 self.kb_running = False
-                logger.info(f"KB processing completed: {kb_result}")
+                logger.info("KB processing completed: %s", kb_result)
             
             # Schedule final GUI updates on main thread
             self.root.after(0, self._finalize_processing_success, gmail_result, kb_result, both_on)
@@ -1988,6 +2121,13 @@ class CombinedApp:
         except Exception as e:
             logger.error(f"Error in finalize_processing_error: {e}")
     
+    def _reset_after_user_cancel(self):
+        """Reset the UI after the user declined the download - runs on the main thread"""
+        self.progress_frame.pack_forget()
+        self.start_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        self.status_var.set("Avbruten av användare")
+    
     def cleanup_after_cancel(self):
         """Clean up after cancellation - thread-safe"""
         logger.info("Processing cancelled by user")
@@ -2025,6 +2165,130 @@ class CombinedApp:
         except Exception as e:
             logger.error(f"Error in handle_no_emails_found: {e}")
     
+    def _show_pdf_conflict_dialog(self, pdf_name):
+        """Ask how to handle an existing PDF - must be called from the main thread
+
+        Returns "overwrite", "overwrite_all", "skip", "skip_all" or "cancel",
+        or None if the window was closed (treated as overwrite, as before).
+        """
+        # Show dialog for PDF file conflict
+        dialog = tk.Toplevel(self.root)
+        dialog.title("PDF-filkonflikt")
+        dialog.geometry("600x500")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.lift()
+        dialog.focus_force()
+        dialog.attributes('-topmost', True)
+        dialog.after(100, dialog.attributes, '-topmost', False)
+
+        # Set icon on dialog
+        self.set_window_icon(dialog)
+
+        # Center the dialog over the parent window (app window)
+        dialog.update_idletasks()
+        self.root.update_idletasks()
+
+        # Get parent window position and size
+        parent_x = self.root.winfo_x()
+        parent_y = self.root.winfo_y()
+        parent_width = self.root.winfo_width()
+        parent_height = self.root.winfo_height()
+
+        # Calculate position to center dialog over parent window
+        dialog_width = 600
+        dialog_height = 500
+        x = parent_x + (parent_width // 2) - (dialog_width // 2)
+        y = parent_y + (parent_height // 2) - (dialog_height // 2)
+
+        dialog.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
+
+        # Create main frame for content
+        main_frame = tk.Frame(dialog)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Create scrollable frame
+        try:
+            import tkinter.ttk as ttk
+            # Create canvas and scrollbar for scrolling
+            canvas = tk.Canvas(main_frame, highlightthickness=0)
+            scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
+            scrollable_frame = tk.Frame(canvas)
+
+            scrollable_frame.bind(
+                "<Configure>",
+                lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+            )
+
+            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+            canvas.configure(yscrollcommand=scrollbar.set)
+
+            # Pack scrollbar and canvas
+            scrollbar.pack(side="right", fill="y")
+            canvas.pack(side="left", fill="both", expand=True)
+
+            content_frame = scrollable_frame
+        except ImportError:
+            # Fallback if ttk not available
+            content_frame = main_frame
+
+        # Message label
+        tk.Label(content_frame, text=f"PDF-filen {pdf_name} finns redan.\n\nVad vill du göra?", 
+                font=("Arial", 11), wraplength=550, justify="center").pack(pady=20)
+
+        # Variables for dialog result
+        dialog_result = {"action": None}
+
+        # Add periodic check for cancellation while dialog is open
+        def check_cancel_during_dialog():
+            if self.cancel_event.is_set():
+                dialog_result["action"] = "cancel"
+                dialog.destroy()
+            else:
+                dialog.after(100, check_cancel_during_dialog)
+
+        # Start the cancellation check
+        dialog.after(100, check_cancel_during_dialog)
+
+        def set_overwrite():
+            dialog_result["action"] = "overwrite"
+            dialog.destroy()
+
+        def set_overwrite_all():
+            dialog_result["action"] = "overwrite_all"
+            dialog.destroy()
+
+        def set_skip():
+            dialog_result["action"] = "skip"
+            dialog.destroy()
+
+        def set_skip_all():
+            dialog_result["action"] = "skip_all"
+            dialog.destroy()
+
+        def set_cancel():
+            dialog_result["action"] = "cancel"
+            dialog.destroy()
+
+        # Button frame for better layout
+        button_frame = tk.Frame(content_frame)
+        button_frame.pack(pady=20)
+
+        tk.Button(button_frame, text="Skriv över", command=set_overwrite, 
+                 width=15, font=("Arial", 10)).pack(pady=3)
+        tk.Button(button_frame, text="Skriv över alla", command=set_overwrite_all, 
+                 width=15, font=("Arial", 10)).pack(pady=3)
+        tk.Button(button_frame, text="Hoppa över", command=set_skip, 
+                 width=15, font=("Arial", 10)).pack(pady=3)
+        tk.Button(button_frame, text="Hoppa över alla", command=set_skip_all, 
+                 width=15, font=("Arial", 10)).pack(pady=3)
+        tk.Button(button_frame, text="Avbryt", command=set_cancel, 
+                 width=15, font=("Arial", 10)).pack(pady=3)
+
+        # Wait for dialog result
+        dialog.wait_window()
+        return dialog_result["action"]
+
     def _show_download_confirmation_dialog(self, email_count, sender_email):
         """Show confirmation dialog for email downloads with custom icon (thread-safe)"""
         try:
@@ -2104,7 +2368,7 @@ class CombinedApp:
         result_win.lift()
         result_win.focus_force()
         result_win.attributes('-topmost', True)
-        result_win.after(100, lambda: result_win.attributes('-topmost', False))
+        result_win.after(100, result_win.attributes, '-topmost', False)
         
         # Center window
         result_win.update_idletasks()
@@ -2140,8 +2404,9 @@ class CombinedApp:
                 f"• Sparade i: {gmail_result.get('output_path', 'N/A')}"
             ]
             
-            for line in gmail_text:
-                tb.Label(content_frame, text=line, font=("Arial", 10)).pack(anchor="w", pady=1)
+            # One multi-line label per section instead of a widget per line
+            tb.Label(content_frame, text="\n".join(gmail_text), font=self._font_normal,
+                     justify="left").pack(anchor="w", pady=1)
         
         # KB results
         if kb_result:
@@ -2158,8 +2423,8 @@ class CombinedApp:
             if kb_result.get('output_path'):
                 kb_text.append(f"• Sparade i: {kb_result['output_path']}")
             
-            for line in kb_text:
-                tb.Label(content_frame, text=line, font=("Arial", 10)).pack(anchor="w", pady=1)
+            tb.Label(content_frame, text="\n".join(kb_text), font=self._font_normal,
+                     justify="left").pack(anchor="w", pady=1)
             
             # Show unknown bib codes information
             if kb_result.get('unknown_bib_count', 0) > 0:
@@ -2167,17 +2432,13 @@ class CombinedApp:
                          font=("Arial", 10, "bold")).pack(anchor="w", pady=(10, 5))
                 
                 unknown_count = kb_result['unknown_bib_count']
-                tb.Label(content_frame, 
-                        text=f"• {unknown_count} filer innehöll okända bib-koder", 
-                        font=("Arial", 9)).pack(anchor="w", pady=1)
-                
-                tb.Label(content_frame, 
-                        text="• Dessa PDF-filer är märkta med tidningsnamnet 'OKÄND'", 
-                        font=("Arial", 9)).pack(anchor="w", pady=1)
-                
-                tb.Label(content_frame, 
-                        text="• Den okända bib-koden bevaras i filnamnet", 
-                        font=("Arial", 9)).pack(anchor="w", pady=1)
+                unknown_text = [
+                    f"• {unknown_count} filer innehöll okända bib-koder",
+                    "• Dessa PDF-filer är märkta med tidningsnamnet 'OKÄND'",
+                    "• Den okända bib-koden bevaras i filnamnet"
+                ]
+                tb.Label(content_frame, text="\n".join(unknown_text), font=self._font_small,
+                         justify="left").pack(anchor="w", pady=1)
                 
         
         # Close button
@@ -7,11 +7,15 @@ Replaces the Excel-based system with a simpler CSV approach
 
 import csv
 import logging
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Display name for bib-codes missing from the CSV file
+UNKNOWN_NAME = "OKÄND"
+
 class CSVHandler:
     """Handles reading and validation of CSV files containing bib-code mappings"""
 
@@ -23,6 +27,10 @@ class CSVHandler:
         self.alias_dict: Dict[str, str] = {}  # bib_code -> alias
         self.loaded_file: Optional[Path] = None
         self.alias_file: Optional[Path] = None
+        # use_alias -> {bib_code: upper-cased display name}, rebuilt after loading a file
+        self._upper_names: Dict[bool, Dict[str, str]] = {}
+        # (path, mtime_ns, size) of the loaded CSV file - an unchanged file is not read again
+        self._loaded_key: Optional[Tuple[str, int, int]] = None
     
     def find_csv_file(self, app_directory: Path) -> Optional[Path]:
         """
@@ -68,42 +76,15 @@ class CSVHandler:
             Tuple of (is_valid, message)
         """
         try:
-            if not file_path.exists():
-                return False, "CSV-filen existerar inte"
-            
-            if not file_path.is_file():
-                return False, "Sökvägen är inte en fil"
-            
-            # Check file size (reasonable limit: 10MB)
-            file_size = file_path.stat().st_size
-            if file_size > 10 * 1024 * 1024:  # 10MB
-                return False, f"CSV-filen är för stor ({file_size / 1024 / 1024:.1f} MB)"
-            
-            if file_size == 0:
-                return False, "CSV-filen är tom"
+            is_valid, msg = self._validate_csv_path(file_path)
+            if not is_valid:
+                return False, msg
             
             # Try to read first few lines to validate format
             with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                first_row = next(reader, None)
-                
-                if not first_row:
-                    return False, "CSV-filen innehåller inga rader"
-                
-                if len(first_row) != 2:
-                    return False, f"CSV-filen måste ha exakt 2 kolumner (tidningsnamn, bib-kod), hittade {len(first_row)}"
-                
-                # Check a few more rows
-                row_count = 1
-                for _ in range(5):  # Check up to 5 more rows
-                    row = next(reader, None)
-                    if row is None:
-                        break
-                    if len(row) != 2:
-                        return False, f"Rad {row_count + 1} har fel antal kolumner"
-                    row_count += 1
+                first_rows = list(islice(csv.reader(f), 6))
             
-            return True, "CSV-filen validerad"
+            return self._validate_csv_rows(first_rows)
             
         except UnicodeDecodeError:
             return False, "CSV-filen har fel teckenkodning (måste vara UTF-8)"
@@ -112,6 +93,43 @@ class CSVHandler:
         except Exception as e:
             return False, f"Fel vid validering av CSV-fil: {str(e)}"
     
+    @staticmethod
+    def _validate_csv_path(file_path: Path) -> Tuple[bool, str]:
+        """Check that the CSV path is a regular, non-empty file of reasonable size"""
+        if not file_path.exists():
+            return False, "CSV-filen existerar inte"
+        
+        if not file_path.is_file():
+            return False, "Sökvägen är inte en fil"
+        
+        # Check file size (reasonable limit: 10MB)
+        file_size = file_path.stat().st_size
+        if file_size > 10 * 1024 * 1024:  # 10MB
+            return False, f"CSV-filen är för stor ({file_size / 1024 / 1024:.1f} MB)"
+        
+        if file_size == 0:
+            return False, "CSV-filen är tom"
+        
+        return True, ""
+    
+    @staticmethod
+    def _validate_csv_rows(first_rows: List[List[str]]) -> Tuple[bool, str]:
+        """Check the column count of the first rows (up to 6) of a CSV file"""
+        first_row = first_rows[0] if first_rows else None
+        
+        if not first_row:
+            return False, "CSV-filen innehåller inga rader"
+        
+        if len(first_row) != 2:
+            return False, f"CSV-filen måste ha exakt 2 kolumner (tidningsnamn, bib-kod), hittade {len(first_row)}"
+        
+        # Check a few more rows
+        for row_count, row in enumerate(first_rows[1:6], 1):
+            if len(row) != 2:
+                return False, f"Rad {row_count + 1} har fel antal kolumner"
+        
+        return True, "CSV-filen validerad"
+    
     def load_csv_file(self, file_path: Path) -> Tuple[bool, str, int]:
         """
         Load the CSV file and create the bib-code dictionary
@@ -124,18 +142,31 @@ class CSVHandler:
         """
         try:
             # First validate the file
-            is_valid, msg = self.validate_csv_file(file_path)
+            is_valid, msg = self._validate_csv_path(file_path)
             if not is_valid:
                 return False, msg, 0
             
-            # Clear existing dictionary
-            self.bib_dict.clear()
+            key = self._file_key(file_path)
+            if key == self._loaded_key and self.bib_dict:
+                count = len(self.bib_dict)
+                logger.debug(f"CSV file unchanged, keeping {count} loaded bib-codes")
+                return True, f"Laddade {count} bib-koder från CSV-filen", count
             
-            # Load the CSV file
+            # Stream the file once; the format check uses the first rows already read
             with open(file_path, 'r', encoding='utf-8') as f:
                 reader = csv.reader(f)
+                first_rows = list(islice(reader, 6))
                 
-                for row_num, row in enumerate(reader, 1):
+                is_valid, msg = self._validate_csv_rows(first_rows)
+                if not is_valid:
+                    return False, msg, 0
+                
+                # Clear existing dictionary
+                self.bib_dict.clear()
+                self._upper_names.clear()
+                self._loaded_key = None
+                
+                for row_num, row in enumerate(chain(first_rows, reader), 1):
                     if len(row) != 2:
                         logger.warning(f"Skipping row {row_num}: incorrect number of columns")
                         continue
@@ -155,11 +186,16 @@ class CSVHandler:
                     self.bib_dict[bib_code] = newspaper_name
             
             self.loaded_file = file_path
+            self._loaded_key = key
             count = len(self.bib_dict)
             
             logger.info(f"Loaded {count} bib-codes from CSV file")
             return True, f"Laddade {count} bib-koder från CSV-filen", count
             
+        except UnicodeDecodeError:
+            return False, "CSV-filen har fel teckenkodning (måste vara UTF-8)", 0
+        except csv.Error as e:
+            return False, f"CSV-formatfel: {str(e)}", 0
         except Exception as e:
             logger.error(f"Error loading CSV file: {e}")
             return False, f"Kunde inte ladda CSV-filen: {str(e)}", 0
@@ -180,6 +216,19 @@ class CSVHandler:
         """Check if a CSV file has been loaded"""
         return bool(self.bib_dict) and self.loaded_file is not None
     
+    @staticmethod
+    def _file_key(file_path: Path) -> Tuple[str, int, int]:
+        """Identify a file version by path, modification time and size"""
+        stat = file_path.stat()
+        return str(file_path), stat.st_mtime_ns, stat.st_size
+    
+    def is_current(self, file_path: Path) -> bool:
+        """Check if file_path is loaded and has not changed on disk since"""
+        try:
+            return self.is_loaded() and self._file_key(file_path) == self._loaded_key
+        except OSError:
+            return False
+    
     def get_loaded_filename(self) -> Optional[str]:
         """Get the name of the currently loaded CSV file"""
         if self.loaded_file:
@@ -202,6 +251,7 @@ class CSVHandler:
         """
         self.alias_dict.clear()
         self.alias_file = None
+        self._upper_names.clear()
 
         alias_path = app_directory / self.ALIAS_FILENAME
         if not alias_path.exists():
@@ -245,7 +295,21 @@ class CSVHandler:
         bib_code = bib_code.strip()
         if use_alias and bib_code in self.alias_dict:
             return self.alias_dict[bib_code]
-        return self.bib_dict.get(bib_code, "OKÄND")
+        return self.bib_dict.get(bib_code, UNKNOWN_NAME)
+
+    def get_upper_display_names(self, use_alias: bool = False) -> Dict[str, str]:
+        """
+        Get the upper-cased display name of every known bib-code.
+
+        Bib-codes that are not in the mapping should be shown as UNKNOWN_NAME.
+        """
+        names = self._upper_names.get(use_alias)
+        if names is None:
+            names = {bib_code: name.upper() for bib_code, name in self.bib_dict.items()}
+            if use_alias:
+                names.update((bib_code, alias.upper()) for bib_code, alias in self.alias_dict.items())
+            self._upper_names[use_alias] = names
+        return names
 
     def is_alias_loaded(self) -> bool:
         """Check if alias file has been loaded"""
@@ -4,13 +4,16 @@ KB file processing functionality
 """
 
 import logging
+import os
+import re
 import shutil
 import tempfile
-import tkinter as tk
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 try:
     from PIL import Image
@@ -18,23 +21,127 @@ try:
 except ImportError:
     IMAGE_PROCESSING_AVAILABLE = False
 
+try:
+    import img2pdf
+    IMG2PDF_AVAILABLE = True
+except ImportError:
+    IMG2PDF_AVAILABLE = False
+
 from ..security import get_secure_ops, get_default_validator
-from .csv_handler import CSVHandler
+from .csv_handler import CSVHandler, UNKNOWN_NAME
 
 logger = logging.getLogger(__name__)
 
+# PDFs are independent, so they are built in separate processes. Each worker holds a
+# whole newspaper issue in memory, which keeps the pool small.
+MAX_PDF_WORKERS = min(os.cpu_count() or 1, 4)
+
+# Extensions (lower-cased) of the input files - the Gmail step downloads both spellings
+_JPG_SUFFIXES = frozenset((".jpg", ".jpeg"))
+
+# KB filename stem: bib code, date and three number groups separated by underscores
+# (anything after the fifth part is ignored)
+_KB_STEM_RE = re.compile(r'([^_]*)_([^_]*)_([^_]*_[^_]*_[^_]*)')
+
+# Write buffer for PDF output - PIL and img2pdf write many small chunks
+PDF_WRITE_BUFFER = 1 << 20  # 1 MB
+
+# Minimum seconds between progress/GUI updates inside the per-file loops
+UI_UPDATE_INTERVAL = 0.1
+
+# Threads used in Phase 1 to validate and move/copy JPGs (I/O-bound, often on network shares)
+MAX_COPY_WORKERS = 8
+
+
+def _load_rgb_image(file_path, max_size: Optional[Tuple[int, int]] = None) -> "Image.Image":
+    """Open an image and return it as an RGB image detached from its file"""
+    img = Image.open(file_path)
+    if max_size:
+        # Let the JPEG decoder scale down by 1/2, 1/4 or 1/8 while decoding (DCT scaling)
+        # instead of decoding at full resolution; other formats ignore this
+        img.draft('RGB', max_size)
+    # Convert to RGB if needed - convert() already returns a new, detached image
+    if img.mode != 'RGB':
+        rgb_img = img.convert('RGB')
+        img.close()  # Close original
+        return rgb_img
+    
+    # load() decodes the pixels and releases the file for single-frame formats
+    # such as JPEG, so the image can be used as is without copying its pixels
+    img.load()
+    if getattr(img, 'fp', None) is None:
+        return img
+    
+    # Multi-frame formats keep their file open - detach with a copy
+    img_copy = img.copy()
+    img.close()  # Close original
+    return img_copy
+
+
+def _parse_page_size(value) -> Optional[Tuple[int, int]]:
+    """Turn the pdf_max_page_size setting ([width, height] in pixels) into a tuple, or None"""
+    if not value:
+        return None
+    try:
+        width, height = (int(v) for v in value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid pdf_max_page_size: {value!r}")
+        return None
+    if width <= 0 or height <= 0:
+        logger.warning(f"Ignoring invalid pdf_max_page_size: {value!r}")
+        return None
+    return width, height
+
+
+def _link_or_copy(src: Path, dest: Path) -> None:
+    """Hard-link src to dest, falling back to a byte copy where linking is not possible"""
+    try:
+        # A hard link only adds a directory entry - no file data is read or written
+        os.link(src, dest)
+    except OSError:
+        # Different filesystem (EXDEV), no hard link support, or dest already exists
+        shutil.copy(src, dest)
+
+
+def _build_pdf(pdf_path: str, image_paths: List[str],
+               max_size: Optional[Tuple[int, int]] = None) -> int:
+    """Create one PDF from a list of images - runs in a worker process"""
+    # img2pdf embeds the JPEG data as is - no decoding, re-encoding or quality loss.
+    # It cannot scale pages, so reduced page sizes always go through PIL.
+    if IMG2PDF_AVAILABLE and not max_size and all(
+            os.path.splitext(path)[1].lower() in _JPG_SUFFIXES for path in image_paths):
+        try:
+            with open(pdf_path, "wb", buffering=PDF_WRITE_BUFFER) as fh:
+                img2pdf.convert(image_paths, outputstream=fh)
+            return len(image_paths)
+        except Exception as e:
+            # e.g. a JPEG img2pdf cannot embed - fall back to PIL
+            logger.warning(f"img2pdf failed for {os.path.basename(pdf_path)}, using PIL: {e}")
+    
+    images = []
+    try:
+        for image_path in image_paths:
+            images.append(_load_rgb_image(image_path, max_size))
+        with open(pdf_path, "wb", buffering=PDF_WRITE_BUFFER) as fh:
+            images[0].save(fh, format="PDF", save_all=True, append_images=images[1:])
+        return len(images)
+    finally:
+        # Clean up image resources
+        for img in images:
+            img.close()
+
+
 class KBProcessor:
     def __init__(self):
         self.cancel_requested = False  # Keep for backward compatibility
         self.cancel_event = None  # Will be set by GUI
-        self.root = None  # Reference to root window for dialogs
-        self.icon_callback = None  # Callback to set window icon
         self.secure_ops = get_secure_ops()
         self.validator = get_default_validator()
         self.csv_handler = CSVHandler()
         # Persistent conflict resolution flags
         self.overwrite_all = False
         self.skip_all = False
+        self._last_ui_ts = 0.0
     
     def reset_conflict_state(self):
         """Reset conflict resolution flags at start of processing"""
@@ -76,19 +183,9 @@ class KBProcessor:
         except Exception as e:
             return False, f"Ogiltig bildfil: {str(e)}"
     
-    def load_image_safely(self, file_path: Path) -> Image.Image:
+    def load_image_safely(self, file_path: Path) -> "Image.Image":
         """Load an image with proper resource management"""
-        img = Image.open(file_path)
-        # Convert to RGB if needed and return a copy to avoid issues with file handles
-        if img.mode != 'RGB':
-            rgb_img = img.convert('RGB')
-            img.close()  # Close original
-            return rgb_img
-        else:
-            # Create a copy to avoid file handle issues
-            img_copy = img.copy()
-            img.close()  # Close original
-            return img_copy
+        return _load_rgb_image(file_path)
     
     def process_images_in_batches(self, file_paths: List[Path], batch_size: int = 10):
         """Process images in batches to manage memory usage"""
@@ -139,13 +236,17 @@ class KBProcessor:
                 except Exception as e:
                     logger.warning(f"Failed to cleanup temp files: {e}")
     
-    def set_root(self, root: tk.Tk):
-        """Set the root window for dialog purposes"""
-        self.root = root
-        
-    def set_icon_callback(self, callback):
-        """Set callback function to apply icon to dialog windows"""
-        self.icon_callback = callback
+    def _tick(self, message: str, progress: int, progress_callback=None,
+              gui_update_callback=None, force: bool = False):
+        """Report progress at most every UI_UPDATE_INTERVAL seconds, unless forced or complete"""
+        now = time.monotonic()
+        if not force and progress < 100 and now - self._last_ui_ts < UI_UPDATE_INTERVAL:
+            return
+        self._last_ui_ts = now
+        if progress_callback:
+            progress_callback(message, progress)
+        if gui_update_callback:
+            gui_update_callback()
     
     def cancel_operation(self):
         self.cancel_requested = True
@@ -197,11 +298,104 @@ class KBProcessor:
         
         return len(errors) == 0, errors
     
+    def _validate_and_place(self, file: Path, dest: Optional[Path], keep_originals: bool) -> bool:
+        """Validate one image and move or link it to its new name (if any) - runs in a worker thread"""
+        if self.is_cancelled():
+            return False
+        
+        # Validate image file
+        is_valid, validation_message = self.validate_image_file(file)
+        if not is_valid:
+            logger.warning("Skipping invalid image %s: %s", file.name, validation_message)
+            return False
+        
+        if dest is None:
+            return True
+        
+        try:
+            # Check cancellation before file operation
+            if self.is_cancelled():
+                return False
+            
+            if not keep_originals:  # When False (default), delete originals
+                # Move (rename) the file instead of copying
+                shutil.move(str(file), str(dest))
+                logger.debug("Moved and renamed: %s -> %s", file.name, dest.name)
+            else:
+                # Link (or copy) the file, keeping original
+                _link_or_copy(file, dest)
+                logger.debug("Copied and renamed: %s -> %s", file.name, dest.name)
+            return True
+        except Exception as e:
+            logger.error("Failed to %s %s: %s", 'move' if not keep_originals else 'copy', file.name, e)
+            return False
+    
+    def _create_pdfs(self, pdf_jobs: List[Tuple[Path, str, List[Path]]],
+                     progress_callback=None, gui_update_callback=None,
+                     max_page_size: Optional[Tuple[int, int]] = None) -> Optional[Dict[str, int]]:
+        """
+        Build PDFs from (pdf_path, newspaper, image_files) jobs in worker processes
+        
+        max_page_size, if given, lets the JPEG decoder reduce pages to about that
+        (width, height) while decoding; None keeps the scans at full resolution.
+        
+        Returns:
+            Number of PDFs created per newspaper, or None if processing was cancelled
+        """
+        pdfs_per_tidning = defaultdict(int)
+        total_pdfs = len(pdf_jobs)
+        if not total_pdfs:
+            return pdfs_per_tidning
+        
+        # A single PDF is built in a thread to avoid the cost of starting a process
+        if total_pdfs == 1:
+            executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            executor = ProcessPoolExecutor(max_workers=min(MAX_PDF_WORKERS, total_pdfs))
+        try:
+            futures = {
+                executor.submit(_build_pdf, str(pdf_path), [str(f) for f in files],
+                                max_page_size): (pdf_path, newspaper)
+                for pdf_path, newspaper, files in pdf_jobs
+            }
+            for pdf_num, future in enumerate(as_completed(futures), 1):
+                if self.is_cancelled():
+                    return None
+                
+                pdf_path, newspaper = futures[future]
+                try:
+                    page_count = future.result()
+                    pdfs_per_tidning[newspaper] += 1
+                    logger.info("Created PDF: %s (%d pages)", pdf_path.name, page_count)
+                except Exception as e:
+                    logger.error("Failed to create PDF %s: %s", pdf_path.name, e)
+                
+                # Update progress for PDF creation phase with percentage
+                pdf_progress = 35 + int((pdf_num / total_pdfs) * 60)  # 35-95%
+                percentage = int((pdf_num / total_pdfs) * 100)
+                self._tick(f"Skapar PDF {pdf_num}/{total_pdfs} ({percentage}%): {newspaper}", pdf_progress,
+                           progress_callback, gui_update_callback, force=pdf_num == total_pdfs)
+        finally:
+            # Drop queued PDFs on cancellation; running workers finish their current file
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        return pdfs_per_tidning
+    
     def process_files(self, csv_path: Union[Path, str], input_dir: str, output_dir: str,
                      keep_renamed: bool = False, keep_originals: bool = False,
                      use_alias: bool = False,
-                     progress_callback=None, gui_update_callback=None) -> Dict:
-        """Process KB files - real implementation"""
+                     progress_callback=None, gui_update_callback=None,
+                     conflict_callback=None, max_page_size=None) -> Dict:
+        """
+        Process KB files - real implementation
+        
+        max_page_size is the pdf_max_page_size setting: [width, height] in pixels that
+        PDF pages may be reduced to while decoding, or None for full resolution.
+        
+        conflict_callback(pdf_name) is called when a PDF already exists and returns one of
+        "overwrite", "overwrite_all", "skip", "skip_all" or "cancel". It is called from
+        the processing thread, so a GUI implementation must show its dialog on the main thread.
+        """
         self.reset_cancel_state()
         self.reset_conflict_state()  # Reset conflict resolution flags
         
@@ -228,12 +422,9 @@ class KBProcessor:
             logger.debug(f"Input dir resolved: {Path(input_dir).resolve()}")
             logger.debug(f"Output dir resolved: {Path(output_dir).resolve()}")
             
-            # Load CSV file if not already loaded
-            if not self.csv_handler.is_loaded() or self.csv_handler.loaded_file != csv_path:
-                if progress_callback:
-                    progress_callback("Läser CSV-fil...", 2)
-                if gui_update_callback:
-                    gui_update_callback()
+            # Load CSV file if not already loaded, or if it has changed since
+            if not self.csv_handler.is_current(csv_path):
+                self._tick("Läser CSV-fil...", 2, progress_callback, gui_update_callback, force=True)
                 
                 success, message, count = self.csv_handler.load_csv_file(csv_path)
                 if not success:
@@ -246,8 +437,14 @@ class KBProcessor:
             output_path = Path(output_dir)
             output_path.mkdir(parents=True, exist_ok=True)
             
-            # Find JPG files
-            jpg_files = sorted(f for f in input_path.glob("*.jpg") if f.is_file())
+            # Find JPG files - scandir gets the file type from the directory listing,
+            # so no extra stat() is needed per entry
+            with os.scandir(input_path) as entries:
+                jpg_files = sorted(
+                    Path(entry.path) for entry in entries
+                    if os.path.splitext(entry.name)[1].lower() in _JPG_SUFFIXES
+                    and entry.is_file(follow_symlinks=False)
+                )
             
             if not jpg_files:
                 return {
@@ -258,481 +455,227 @@ class KBProcessor:
             
             logger.info(f"Found {len(jpg_files)} JPG files to process")
             
-            # Setup temporary directory (with manual cleanup)
+            # Renamed copies are only written when the user wants to keep them - otherwise
+            # the PDFs are built straight from the original files
             if keep_renamed:
-                temp_path = output_path / "Jpg-filer med fina namn"
-                temp_path.mkdir(parents=True, exist_ok=True)
-                cleanup_temp = False
+                renamed_dir = output_path / "Jpg-filer med fina namn"
+                renamed_dir.mkdir(parents=True, exist_ok=True)
             else:
-                temp_path = Path(tempfile.mkdtemp(prefix="renamed_jpgs_"))
-                cleanup_temp = True
+                renamed_dir = None
             
-            try:
+            # Phase 1: Rename files
+            self._tick("Fas 1: Döper om filer...", 5, progress_callback, gui_update_callback, force=True)
+            
+            renamed_files = []  # (new_name, group key, path to read the image from)
+            total_files = len(jpg_files)
+            unknown_bib_codes = set()  # Track unknown bib codes
+            placements = []  # (file, new_name, group key, bib_code, tidning) for every parsable filename
+            # bib_code -> upper-cased newspaper name, resolved once for all known codes
+            display_names = self.csv_handler.get_upper_display_names(use_alias)
+        
+            for file in jpg_files:
+                if self.is_cancelled():
+                    return {"cancelled": True}
+                
+                stem = file.stem
+                suffix = file.suffix
+                extra = ""
+                
+                # Handle duplicate numbering in parentheses
+                if "(" in stem and ")" in stem[-3:]:
+                    base, extra = stem.rsplit("(", 1)
+                    extra = "(" + extra
+                    stem = base.strip("_ ")
+                
+                match = _KB_STEM_RE.match(stem)
+                if not match:
+                    logger.warning("Skipping file with unexpected format: %s", file.name)
+                    continue
+                
+                # e.g. "bib13991089", "20240101", "0_1_x"
+                bib_full, date_raw, siffergrupper = match.groups()
                 
-                # Phase 1: Rename files
-                if progress_callback:
-                    progress_callback("Fas 1: Döper om filer...", 5)
-                if gui_update_callback:
-                    gui_update_callback()
+                # Extract numeric bib-code for CSV lookup
+                if bib_full.startswith("bib"):
+                    bib_code = bib_full[3:]  # Remove "bib" prefix -> "13991089"
+                else:
+                    bib_code = bib_full  # Fallback if format is different
+                    logger.warning("Unexpected bib format (no 'bib' prefix): %s", bib_full)
                 
-                renamed_files = []
-                total_files = len(jpg_files)
-                unknown_bib_codes = set()  # Track unknown bib codes
+                # Format date
+                try:
+                    date = f"{date_raw[:4]}-{date_raw[4:6]}-{date_raw[6:]}"
+                except (IndexError, ValueError):
+                    date = "0000-00-00"
+                    logger.warning("Could not parse date from: %s", date_raw)
+                
+                tidning = display_names.get(bib_code, UNKNOWN_NAME)
+                
+                # Debug logging for bib-code lookup (%-style: only formatted when DEBUG is on)
+                logger.debug("File: %s | Bib: %s -> %s -> %s", file.name, bib_full, bib_code, tidning)
+                
+                # Create new filename with full bib code included
+                new_name = f"{date} {tidning} {bib_full} {siffergrupper}{extra}{suffix}"
+                
+                # Sanitize filename for security
+                new_name = self.sanitize_filename(new_name)
+                
+                # One PDF per date and newspaper - unknown bib codes are kept apart by
+                # including the bib code
+                if tidning == UNKNOWN_NAME:
+                    key = (date, f"{tidning} {bib_full}")
+                else:
+                    key = (date, tidning)
+                placements.append((file, new_name, key, bib_code, tidning))
             
-                for i, file in enumerate(jpg_files):
+            # Validating an image decodes it and moving/copying is file I/O - both
+            # release the GIL, so the files are handled by a pool of threads
+            executor = ThreadPoolExecutor(max_workers=MAX_COPY_WORKERS)
+            try:
+                futures = {}
+                for file, new_name, key, bib_code, tidning in placements:
+                    dest = renamed_dir / new_name if renamed_dir else None
+                    future = executor.submit(self._validate_and_place, file, dest, keep_originals)
+                    futures[future] = (file, new_name, key, dest, bib_code, tidning)
+                for i, future in enumerate(as_completed(futures)):
                     if self.is_cancelled():
                         return {"cancelled": True}
                     
+                    file, new_name, key, dest, bib_code, tidning = futures[future]
+                    
                     # Update progress for renaming phase with percentage
                     rename_progress = 5 + int((i / total_files) * 30)  # 5-35%
                     percentage = int(((i + 1) / total_files) * 100)
-                    if progress_callback:
-                        progress_callback(f"Döper om fil {i+1}/{total_files} ({percentage}%): {file.name}", rename_progress)
-                    if gui_update_callback:
-                        gui_update_callback()
+                    self._tick(f"Döper om fil {i+1}/{total_files} ({percentage}%): {file.name}", rename_progress,
+                               progress_callback, gui_update_callback)
                     
-                    # Check cancellation before validation
-                    if self.is_cancelled():
-                        return {"cancelled": True}
-                    
-                    # Validate image file
-                    is_valid, validation_message = self.validate_image_file(file)
-                    if not is_valid:
-                        logger.warning(f"Skipping invalid image {file.name}: {validation_message}")
-                        continue
-                    
-                    stem = file.stem
-                    suffix = file.suffix
-                    extra = ""
-                    
-                    # Handle duplicate numbering in parentheses
-                    if "(" in stem and ")" in stem[-3:]:
-                        base, extra = stem.rsplit("(", 1)
-                        extra = "(" + extra
-                        stem = base.strip("_ ")
-                    
-                    parts = stem.split("_")
-                    if len(parts) < 5:
-                        logger.warning(f"Skipping file with unexpected format: {file.name}")
+                    if not future.result():
                         continue
                     
-                    bib_full = parts[0]  # e.g. "bib13991089"
-                    date_raw = parts[1]
-                    
-                    # Extract numeric bib-code for CSV lookup
-                    if bib_full.startswith("bib"):
-                        bib_code = bib_full[3:]  # Remove "bib" prefix -> "13991089"
-                    else:
-                        bib_code = bib_full  # Fallback if format is different
-                        logger.warning(f"Unexpected bib format (no 'bib' prefix): {bib_full}")
-                    
-                    # Format date
-                    try:
-                        date = f"{date_raw[:4]}-{date_raw[4:6]}-{date_raw[6:]}"
-                    except (IndexError, ValueError):
-                        date = "0000-00-00"
-                        logger.warning(f"Could not parse date from: {date_raw}")
-                    
-                    siffergrupper = "_".join(parts[2:5])
-                    tidning = self.csv_handler.get_display_name(bib_code, use_alias=use_alias).upper()
-                    
-                    # Debug logging for bib-code lookup
-                    logger.debug(f"File: {file.name} | Bib: {bib_full} -> {bib_code} -> {tidning}")
-                    
                     # Track unknown bib codes
-                    if tidning == "OKÄND":
+                    if tidning == UNKNOWN_NAME:
                         unknown_bib_codes.add(bib_code)  # Store numeric code for better error reporting
-                        logger.info(f"Unknown bib-code: {bib_full} -> extracted: {bib_code}")
-                    
-                    # Create new filename with full bib code included
-                    new_name = f"{date} {tidning} {bib_full} {siffergrupper}{extra}{suffix}"
-                    
-                    # Sanitize filename for security
-                    new_name = self.sanitize_filename(new_name)
-                    dest = temp_path / new_name
+                        logger.info("Unknown bib-code in %s -> extracted: %s", file.name, bib_code)
                     
-                    try:
-                        # Check cancellation before file operation
-                        if self.is_cancelled():
-                            return {"cancelled": True}
-                        
-                        if not keep_originals:  # When False (default), delete originals
-                            # Move (rename) the file instead of copying
-                            shutil.move(str(file), str(dest))
-                            logger.debug(f"Moved and renamed: {file.name} -> {new_name}")
-                        else:
-                            # Copy the file, keeping original
-                            shutil.copy(file, dest)
-                            logger.debug(f"Copied and renamed: {file.name} -> {new_name}")
-                        renamed_files.append(dest)
-                    except Exception as e:
-                        logger.error(f"Failed to {'move' if not keep_originals else 'copy'} {file.name}: {e}")
-                        continue
-                
-                logger.info(f"Successfully renamed {len(renamed_files)} files")
+                    renamed_files.append((new_name, key, dest or file))
+            finally:
+                # Drop queued files on cancellation; running copies finish
+                executor.shutdown(wait=True, cancel_futures=True)
             
-                # Group files for PDF creation
-                if progress_callback:
-                    progress_callback("Grupperar filer för PDF-skapande...", 35)
-                if gui_update_callback:
-                    gui_update_callback()
-                
-                grouped = {}
-                for f in renamed_files:
-                    parts = f.stem.split()
-                    if len(parts) < 4:  # date, newspaper, bib, numbers
-                        logger.warning(f"Unexpected renamed file format: {f.name}")
-                        continue
-                    
-                    # For OKÄND files, include bib code in grouping key
-                    if parts[1] == "OKÄND":
-                        # Group by date, newspaper, and bib code for OKÄND files
-                        key = (parts[0], f"{parts[1]} {parts[2]}")
-                    else:
-                        # Group by date and newspaper (excluding bib and numbers)
-                        key = (parts[0], " ".join(parts[1:-2]))
-                    grouped.setdefault(key, []).append(f)
-                
-                logger.info(f"Grouped {len(renamed_files)} files into {len(grouped)} PDF groups")
+            # Threads finish in any order - the new names give the page order
+            renamed_files.sort()
+            logger.info(f"Successfully renamed {len(renamed_files)} files")
+        
+            # Group files for PDF creation
+            self._tick("Grupperar filer för PDF-skapande...", 35, progress_callback, gui_update_callback, force=True)
+            
+            grouped = defaultdict(list)
+            for _, key, f in renamed_files:
+                grouped[key].append(f)
+            
+            logger.info(f"Grouped {len(renamed_files)} files into {len(grouped)} PDF groups")
+        
+            # Phase 2: Create PDFs
+            created_count = 0
+            overwritten_count = 0
+            skipped_count = 0
+            pdf_jobs = []
+            
+            total_pdfs = len(grouped)
             
-                # Phase 2: Create PDFs
-                created_count = 0
-                overwritten_count = 0
-                skipped_count = 0
-                pdfs_per_tidning = defaultdict(int)
+            # Resolve PDF names and conflicts first - the conflict dialog needs the GUI
+            for pdf_num, ((date, newspaper), files) in enumerate(grouped.items(), 1):
+                if self.is_cancelled():
+                    return {"cancelled": True}
                 
-                total_pdfs = len(grouped)
+                # Files are already in page order from the sorted new names
+                sorted_files = files
                 
-                for pdf_num, ((date, newspaper), files) in enumerate(grouped.items(), 1):
+                # Every file was validated in Phase 1 before being renamed, so the
+                # page count is known without decoding the images again
+                pdf_name = f"{date} {newspaper} ({len(sorted_files)} sid).pdf"
+                
+                # Sanitize PDF filename for security
+                pdf_name = self.sanitize_filename(pdf_name)
+                pdf_path = output_path / pdf_name
+            
+                # Handle existing PDF files with dialog
+                if pdf_path.exists():
+                    # Check cancellation before showing dialog
                     if self.is_cancelled():
                         return {"cancelled": True}
                     
-                    # Update progress for PDF creation phase with percentage
-                    pdf_progress = 35 + int((pdf_num / total_pdfs) * 60)  # 35-95%
-                    percentage = int((pdf_num / total_pdfs) * 100)
-                    if progress_callback:
-                        progress_callback(f"Skapar PDF {pdf_num}/{total_pdfs} ({percentage}%): {newspaper}", pdf_progress)
-                    if gui_update_callback:
-                        gui_update_callback()
-                    
-                    # Sort files for consistent ordering
-                    sorted_files = sorted(files)
-                    
-                    # Pre-validate files to get accurate page count
-                    valid_files_count = 0
-                    for img_file in sorted_files:
-                        is_valid, _ = self.validate_image_file(img_file)
-                        if is_valid:
-                            valid_files_count += 1
-                    
-                    # Skip if no valid files
-                    if valid_files_count == 0:
-                        logger.warning(f"No valid images found for group {date} {newspaper}")
+                    # Check persistent conflict resolution flags first
+                    if self.skip_all:
+                        skipped_count += 1
+                        logger.info("Skipping PDF (Skip All selected): %s", pdf_name)
                         continue
                     
-                    # Determine PDF filename - always include page count
-                    pdf_name = f"{date} {newspaper} ({valid_files_count} sid).pdf"
-                    
-                    # Sanitize PDF filename for security
-                    pdf_name = self.sanitize_filename(pdf_name)
-                    pdf_path = output_path / pdf_name
-                
-                    # Handle existing PDF files with dialog
-                    if pdf_path.exists():
-                        # Check cancellation before showing dialog
-                        if self.is_cancelled():
-                            return {"cancelled": True}
+                    if self.overwrite_all:
+                        overwritten_count += 1
+                        logger.info("Overwriting PDF (Overwrite All selected): %s", pdf_name)
+                    else:
+                        # Ask the caller (the GUI shows a dialog); overwrite if nobody asks
+                        action = conflict_callback(pdf_name) if conflict_callback else "overwrite"
+                        if action == "overwrite_all":
+                            self.overwrite_all = True  # Set persistent flag
+                        elif action == "skip_all":
+                            self.skip_all = True  # Set persistent flag
                         
-                        # Check persistent conflict resolution flags first
-                        if self.skip_all:
+                        # Handle dialog result
+                        if action == "cancel":
+                            return {"cancelled": True}
+                        elif action == "skip":
                             skipped_count += 1
-                            logger.info(f"Skipping PDF (Skip All selected): {pdf_name}")
+                            logger.info("Skipped existing PDF: %s", pdf_name)
                             continue
-                        
-                        if self.overwrite_all:
+                        elif action == "skip_all":
+                            # Skip this and all remaining PDFs
+                            skipped_count += total_pdfs - pdf_num + 1
+                            logger.info("Skipping all remaining PDFs")
+                            break
+                        elif action == "overwrite_all":
+                            # Overwrite all remaining PDFs
                             overwritten_count += 1
-                            logger.info(f"Overwriting PDF (Overwrite All selected): {pdf_name}")
-                        else:
-                            # Show dialog for PDF file conflict
-                            dialog = tk.Toplevel(self.root)
-                            dialog.title("PDF-filkonflikt")
-                            dialog.geometry("600x500")
-                            dialog.transient(self.root)
-                            dialog.grab_set()
-                            dialog.lift()
-                            dialog.focus_force()
-                            dialog.attributes('-topmost', True)
-                            dialog.after(100, lambda: dialog.attributes('-topmost', False))
-                            
-                            # Set icon if callback available
-                            if self.icon_callback:
-                                self.icon_callback(dialog)
-                            
-                            # Center the dialog over the parent window (app window)
-                            dialog.update_idletasks()
-                            self.root.update_idletasks()
-                            
-                            # Get parent window position and size
-                            parent_x = self.root.winfo_x()
-                            parent_y = self.root.winfo_y()
-                            parent_width = self.root.winfo_width()
-                            parent_height = self.root.winfo_height()
-                            
-                            # Calculate position to center dialog over parent window
-                            dialog_width = 600
-                            dialog_height = 500
-                            x = parent_x + (parent_width // 2) - (dialog_width // 2)
-                            y = parent_y + (parent_height // 2) - (dialog_height // 2)
-                            
-                            dialog.geometry(f"{dialog_width}x{dialog_height}+{x}+{y}")
-                            
-                            # Create main frame for content
-                            main_frame = tk.Frame(dialog)
-                            main_frame.pack(fill="both", expand=True, padx=10, pady=10)
-                            
-                            # Create scrollable frame
-                            try:
-                                import tkinter.ttk as ttk
-                                # Create canvas and scrollbar for scrolling
-                                canvas = tk.Canvas(main_frame, highlightthickness=0)
-                                scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-                                scrollable_frame = tk.Frame(canvas)
-                                
-                                scrollable_frame.bind(
-                                    "<Configure>",
-                                    lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-                                )
-                                
-                                canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-                                canvas.configure(yscrollcommand=scrollbar.set)
-                                
-                                # Pack scrollbar and canvas
-                                scrollbar.pack(side="right", fill="y")
-                                canvas.pack(side="left", fill="both", expand=True)
-                                
-                                content_frame = scrollable_frame
-                            except ImportError:
-                                # Fallback if ttk not available
-                                content_frame = main_frame
-                            
-                            # Message label
-                            tk.Label(content_frame, text=f"PDF-filen {pdf_name} finns redan.\n\nVad vill du göra?", 
-                                    font=("Arial", 11), wraplength=550, justify="center").pack(pady=20)
-                        
-                            # Variables for dialog result
-                            dialog_result = {"action": None}
-                            
-                            # Add periodic check for cancellation while dialog is open
-                            def check_cancel_during_dialog():
-                                if self.is_cancelled():
-                                    dialog_result["action"] = "cancel"
-                                    dialog.destroy()
-                                else:
-                                    dialog.after(100, check_cancel_during_dialog)
-                            
-                            # Start the cancellation check
-                            dialog.after(100, check_cancel_during_dialog)
-                            
-                            def set_overwrite():
-                                dialog_result["action"] = "overwrite"
-                                dialog.destroy()
-                            
-                            def set_overwrite_all():
-                                self.overwrite_all = True  # Set persistent flag
-                                dialog_result["action"] = "overwrite_all"
-                                dialog.destroy()
-                            
-                            def set_skip():
-                                dialog_result["action"] = "skip"
-                                dialog.destroy()
-                            
-                            def set_skip_all():
-                                self.skip_all = True  # Set persistent flag
-                                dialog_result["action"] = "skip_all"
-                                dialog.destroy()
-                            
-                            def set_cancel():
-                                dialog_result["action"] = "cancel"
-                                dialog.destroy()
-                            
-                            # Button frame for better layout
-                            button_frame = tk.Frame(content_frame)
-                            button_frame.pack(pady=20)
-                            
-                            tk.Button(button_frame, text="Skriv över", command=set_overwrite, 
-                                     width=15, font=("Arial", 10)).pack(pady=3)
-                            tk.Button(button_frame, text="Skriv över alla", command=set_overwrite_all, 
-                                     width=15, font=("Arial", 10)).pack(pady=3)
-                            tk.Button(button_frame, text="Hoppa över", command=set_skip, 
-                                     width=15, font=("Arial", 10)).pack(pady=3)
-                            tk.Button(button_frame, text="Hoppa över alla", command=set_skip_all, 
-                                     width=15, font=("Arial", 10)).pack(pady=3)
-                            tk.Button(button_frame, text="Avbryt", command=set_cancel, 
-                                     width=15, font=("Arial", 10)).pack(pady=3)
-                            
-                            # Wait for dialog result
-                            dialog.wait_window()
-                        
-                            # Handle dialog result
-                            if dialog_result["action"] == "cancel":
-                                return {"cancelled": True}
-                            elif dialog_result["action"] == "skip":
-                                skipped_count += 1
-                                logger.info(f"Skipped existing PDF: {pdf_name}")
-                                continue
-                            elif dialog_result["action"] == "skip_all":
-                                # Skip all remaining PDFs
-                                for remaining_pdf in grouped.items():
-                                    if remaining_pdf[0] != (date, newspaper):
-                                        skipped_count += 1
-                                logger.info("Skipping all remaining PDFs")
-                                break
-                            elif dialog_result["action"] == "overwrite_all":
-                                # Overwrite all remaining PDFs
-                                overwritten_count += 1
-                                logger.info(f"Overwriting existing PDF: {pdf_name}")
-                            else:  # overwrite
-                                overwritten_count += 1
-                                logger.info(f"Overwriting existing PDF: {pdf_name}")
-                    else:
-                        created_count += 1
-                
-                    # Validate all images before processing
-                    valid_files = []
-                    for img_file in sorted_files:
-                        # Check cancellation during image validation
-                        if self.is_cancelled():
-                            return {"cancelled": True}
-                        
-                        is_valid, validation_message = self.validate_image_file(img_file)
-                        if not is_valid:
-                            logger.error(f"Invalid image in PDF group {pdf_name}: {img_file.name} - {validation_message}")
-                        else:
-                            valid_files.append(img_file)
-                    
-                    # Skip PDF creation if no valid files
-                    if valid_files:
-                        # Create PDF using PIL
-                        try:
-                            # Check cancellation before starting PDF creation
-                            if self.is_cancelled():
-                                return {"cancelled": True}
-                            
-                            # Load first image safely
-                            first_img = self.load_image_safely(valid_files[0])
-                        
-                            try:
-                                # Check cancellation after first image load
-                                if self.is_cancelled():
-                                    first_img.close()
-                                    return {"cancelled": True}
-                                
-                                # For large PDFs (>10 pages), show loading progress
-                                if len(valid_files) > 10:
-                                    # Load additional images with progress tracking
-                                    additional_images = []
-                                    for i, f in enumerate(valid_files[1:], 1):
-                                        if self.is_cancelled():
-                                            # Clean up loaded images before breaking
-                                            for img in additional_images:
-                                                img.close()
-                                            break
-                                        
-                                        # Update progress for loading large PDFs
-                                        load_progress = int((i / (len(valid_files) - 1)) * 50)  # 50% of sub-progress for loading
-                                        sub_progress = pdf_progress + (load_progress * 0.3)  # 30% of total progress for this PDF
-                                        if progress_callback:
-                                            progress_callback(f"Laddar bilder för stor PDF {pdf_num}/{total_pdfs}: {i+1}/{len(valid_files)}", int(sub_progress))
-                                        if gui_update_callback:
-                                            gui_update_callback()
-                                        
-                                        additional_images.append(self.load_image_safely(f))
-                                    
-                                    # Final cancellation check before PDF save
-                                    if self.is_cancelled():
-                                        first_img.close()
-                                        for img in additional_images:
-                                            img.close()
-                                        return {"cancelled": True}
-                                    
-                                    # Show PDF creation progress
-                                    save_progress = pdf_progress + 15  # 15% more progress for saving
-                                    if progress_callback:
-                                        progress_callback(f"Skapar stor PDF {pdf_num}/{total_pdfs}: {newspaper} ({len(valid_files)} sidor)", int(save_progress))
-                                    if gui_update_callback:
-                                        gui_update_callback()
-                                    
-                                    # Create PDF with proper resource management
-                                    first_img.save(
-                                        pdf_path,
-                                        save_all=True,
-                                        append_images=additional_images
-                                    )
-                                else:
-                                    # Small PDFs - load normally without sub-progress
-                                    additional_images = []
-                                    for f in valid_files[1:]:
-                                        if self.is_cancelled():
-                                            # Clean up loaded images before breaking
-                                            for img in additional_images:
-                                                img.close()
-                                            break
-                                        additional_images.append(self.load_image_safely(f))
-                                    
-                                    # Final cancellation check before PDF save
-                                    if self.is_cancelled():
-                                        first_img.close()
-                                        for img in additional_images:
-                                            img.close()
-                                        return {"cancelled": True}
-                                    
-                                    # Create PDF with proper resource management
-                                    first_img.save(
-                                        pdf_path,
-                                        save_all=True,
-                                        append_images=additional_images
-                                    )
-                            finally:
-                                # Clean up image resources
-                                first_img.close()
-                                for img in additional_images:
-                                    img.close()
-                        
-                            pdfs_per_tidning[newspaper] += 1
-                            logger.info(f"Created PDF: {pdf_name} ({len(valid_files)} pages)")
-                            
-                        except Exception as e:
-                            logger.error(f"Failed to create PDF {pdf_name}: {e}")
-                    else:
-                        logger.error(f"No valid images found for PDF {pdf_name}")
+                            logger.info("Overwriting existing PDF: %s", pdf_name)
+                        else:  # overwrite
+                            overwritten_count += 1
+                            logger.info("Overwriting existing PDF: %s", pdf_name)
+                else:
+                    created_count += 1
             
-                # Cleanup is handled by context manager
-                if progress_callback:
-                    progress_callback("KB-bearbetning slutförd!", 100)
-                if gui_update_callback:
-                    gui_update_callback()
-                
-                result = {
-                    "total_files": len(jpg_files),
-                    "created_count": created_count,
-                    "overwritten_count": overwritten_count,
-                    "skipped_count": skipped_count,
-                    "pdfs_per_tidning": dict(pdfs_per_tidning),
-                    "output_path": str(output_path.absolute()),
-                    "unknown_bib_codes": list(unknown_bib_codes),
-                    "unknown_bib_count": len(unknown_bib_codes)
-                }
-                
-                logger.info(f"KB processing completed successfully: {result}")
-                return result
-            finally:
-                # Cleanup temporary directory if needed
-                if cleanup_temp:
+                pdf_jobs.append((pdf_path, newspaper, sorted_files))
+            
+            # Build the PDFs in parallel now that all names and conflicts are resolved
+            pdfs_per_tidning = self._create_pdfs(pdf_jobs, progress_callback, gui_update_callback,
+                                                 _parse_page_size(max_page_size))
+            if pdfs_per_tidning is None:
+                return {"cancelled": True}
+            
+            # Without renamed copies the originals were read in place - remove them now
+            # that the PDFs exist unless the user wants to keep them
+            if not keep_renamed and not keep_originals:
+                for _, _, f in renamed_files:
                     try:
-                        shutil.rmtree(temp_path, ignore_errors=True)
-                        logger.info("Cleaned up temporary files")
-                    except Exception as e:
-                        logger.warning(f"Failed to cleanup temp files: {e}")
+                        f.unlink()
+                    except OSError as e:
+                        logger.warning("Failed to delete original %s: %s", f.name, e)
+            
+            self._tick("KB-bearbetning slutförd!", 100, progress_callback, gui_update_callback, force=True)
+            
+            result = {
+                "total_files": len(jpg_files),
+                "created_count": created_count,
+                "overwritten_count": overwritten_count,
+                "skipped_count": skipped_count,
+                "pdfs_per_tidning": dict(pdfs_per_tidning),
+                "output_path": str(output_path.absolute()),
+                "unknown_bib_codes": list(unknown_bib_codes),
+                "unknown_bib_count": len(unknown_bib_codes)
+            }
+            
+            logger.info(f"KB processing completed successfully: {result}")
+            return result
             
         except Exception as e:
             logger.error(f"KB processing error: {e}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for config merging, the XDG Downloads lookup and atomic config saving
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src to path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src import config
+
+
+class TestDeepMergeConfig(unittest.TestCase):
+    """Test in-place merging of saved settings with defaults"""
+
+    def test_missing_keys_are_filled_in_place(self):
+        default = {"a": 1, "b": 2, "nested": {"x": 1, "y": 2}}
+        user = {"a": 10, "nested": {"x": 5}}
+        nested = user["nested"]
+
+        merged = config._deep_merge_config(default, user)
+
+        self.assertIs(merged, user)
+        self.assertIs(merged["nested"], nested)
+        self.assertEqual(merged, {"a": 10, "b": 2, "nested": {"x": 5, "y": 2}})
+
+    def test_user_value_replaces_default_dict(self):
+        merged = config._deep_merge_config({"nested": {"x": 1}}, {"nested": "custom"})
+        self.assertEqual(merged, {"nested": "custom"})
+
+
+class TestReadXdgDownloadDir(unittest.TestCase):
+    """Test parsing of user-dirs.dirs without the xdg-user-dir tool"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.home = self.temp_dir / "home"
+        self.config_home = self.temp_dir / "xdg"
+        self.config_home.mkdir()
+        patches = [
+            mock.patch.object(config, "_HOME_DIR", self.home),
+            mock.patch.dict(os.environ, {"XDG_CONFIG_HOME": str(self.config_home)}),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_dirs(self, line):
+        (self.config_home / "user-dirs.dirs").write_text(
+            '# written by xdg-user-dirs-update\nXDG_DESKTOP_DIR="$HOME/Desktop"\n' + line + "\n",
+            encoding="utf-8")
+
+    def test_home_relative_value(self):
+        self._write_dirs('XDG_DOWNLOAD_DIR="$HOME/Hämtningar"')
+        self.assertEqual(config._read_xdg_download_dir(), self.home / "Hämtningar")
+
+    def test_absolute_value(self):
+        self._write_dirs('XDG_DOWNLOAD_DIR="/data/downloads"')
+        self.assertEqual(config._read_xdg_download_dir(), Path("/data/downloads"))
+
+    def test_home_itself_means_disabled(self):
+        self._write_dirs('XDG_DOWNLOAD_DIR="$HOME/"')
+        self.assertIsNone(config._read_xdg_download_dir())
+
+    def test_relative_value_is_ignored(self):
+        self._write_dirs('XDG_DOWNLOAD_DIR="downloads"')
+        self.assertIsNone(config._read_xdg_download_dir())
+
+    def test_missing_file_or_entry(self):
+        self.assertIsNone(config._read_xdg_download_dir())
+        self._write_dirs('XDG_MUSIC_DIR="$HOME/Music"')
+        self.assertIsNone(config._read_xdg_download_dir())
+
+
+class TestSaveConfig(unittest.TestCase):
+    """Test that configuration is written atomically and only when changed"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.config_file = self.temp_dir / "settings" / "djs_kb-maskin_settings.json"
+        patches = [
+            mock.patch.object(config, "get_config_file_path", return_value=self.config_file),
+            mock.patch.object(config, "_last_serialized", None),
+            mock.patch.object(config, "_config_dir_ready", False),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_save_writes_file_without_leftover_tmp(self):
+        config.save_config({"kb_enabled": True})
+
+        saved = config._loads(self.config_file.read_bytes())
+        self.assertTrue(saved["kb_enabled"])
+        self.assertEqual(saved["_config_version"], config.get_version())
+        self.assertEqual(list(self.config_file.parent.glob("*.tmp")), [])
+
+    def test_unchanged_config_is_not_rewritten(self):
+        config.save_config({"kb_enabled": True})
+        self.config_file.write_bytes(b"edited elsewhere")
+
+        config.save_config({"kb_enabled": True})
+        self.assertEqual(self.config_file.read_bytes(), b"edited elsewhere")
+
+        config.save_config({"kb_enabled": False})
+        self.assertFalse(config._loads(self.config_file.read_bytes())["kb_enabled"])
+
+    def test_failed_write_keeps_existing_file(self):
+        config.save_config({"kb_enabled": True})
+        before = self.config_file.read_bytes()
+
+        with mock.patch.object(Path, "replace", side_effect=IOError("disk full")):
+            config.save_config({"kb_enabled": False})
+
+        self.assertEqual(self.config_file.read_bytes(), before)
+        self.assertFalse(config._config_dir_ready)
+
+    def test_load_returns_saved_values_in_new_dict(self):
+        config.save_config({"kb_enabled": True, "update_settings": {"check_on_startup": False}})
+
+        with mock.patch.object(config, "get_user_downloads_folder", return_value=self.temp_dir), \
+                mock.patch.object(config, "migrate_config_if_needed"):
+            first = config.load_config()
+            second = config.load_config()
+
+        self.assertTrue(first["kb_enabled"])
+        self.assertFalse(first["update_settings"]["check_on_startup"])
+        self.assertTrue(first["update_settings"]["auto_check_enabled"])
+        self.assertIsNot(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for bib-code CSV loading, change detection and display names
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.kb.csv_handler import CSVHandler
+
+
+class TestCSVHandler(unittest.TestCase):
+    """Test the cached bib-code mapping and its invalidation"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.csv_path = self.temp_dir / "titles_bibids_2024.csv"
+        self.csv_path.write_text("Dagens Nyheter,111\nSvenska Dagbladet,222\n", encoding="utf-8")
+        self.handler = CSVHandler()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _rewrite(self, text):
+        """Rewrite the CSV file and move its mtime so the change is always visible"""
+        stat = self.csv_path.stat()
+        self.csv_path.write_text(text, encoding="utf-8")
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_is_current_tracks_file_changes(self):
+        self.assertFalse(self.handler.is_current(self.csv_path))
+
+        success, _, count = self.handler.load_csv_file(self.csv_path)
+        self.assertTrue(success)
+        self.assertEqual(count, 2)
+        self.assertTrue(self.handler.is_current(self.csv_path))
+
+        self._rewrite("Dagens Nyheter,111\n")
+        self.assertFalse(self.handler.is_current(self.csv_path))
+
+    def test_is_current_for_missing_or_other_file(self):
+        self.handler.load_csv_file(self.csv_path)
+        self.assertFalse(self.handler.is_current(self.temp_dir / "missing.csv"))
+
+        self.csv_path.unlink()
+        self.assertFalse(self.handler.is_current(self.csv_path))
+
+    def test_reload_after_change_rebuilds_display_names(self):
+        self.handler.load_csv_file(self.csv_path)
+        self.assertEqual(self.handler.get_upper_display_names(),
+                         {"111": "DAGENS NYHETER", "222": "SVENSKA DAGBLADET"})
+
+        self._rewrite("Expressen,333\n")
+        success, _, count = self.handler.load_csv_file(self.csv_path)
+
+        self.assertTrue(success)
+        self.assertEqual(count, 1)
+        self.assertEqual(self.handler.get_upper_display_names(), {"333": "EXPRESSEN"})
+        self.assertTrue(self.handler.is_current(self.csv_path))
+
+    def test_display_names_with_alias(self):
+        (self.temp_dir / CSVHandler.ALIAS_FILENAME).write_text(
+            "Tidningsnamn,bib-kod,alias\nDagens Nyheter,111,dn\n", encoding="utf-8")
+        self.handler.load_csv_file(self.csv_path)
+
+        success, _, count = self.handler.load_alias_file(self.temp_dir)
+
+        self.assertTrue(success)
+        self.assertEqual(count, 1)
+        self.assertEqual(self.handler.get_upper_display_names(use_alias=True),
+                         {"111": "DN", "222": "SVENSKA DAGBLADET"})
+        self.assertEqual(self.handler.get_upper_display_names(use_alias=False),
+                         {"111": "DAGENS NYHETER", "222": "SVENSKA DAGBLADET"})
+
+    def test_alias_reload_invalidates_display_names(self):
+        alias_path = self.temp_dir / CSVHandler.ALIAS_FILENAME
+        alias_path.write_text("Tidningsnamn,bib-kod,alias\nDagens Nyheter,111,dn\n", encoding="utf-8")
+        self.handler.load_csv_file(self.csv_path)
+        self.handler.load_alias_file(self.temp_dir)
+        self.assertEqual(self.handler.get_upper_display_names(use_alias=True)["111"], "DN")
+
+        alias_path.unlink()
+        self.handler.load_alias_file(self.temp_dir)
+
+        self.assertEqual(self.handler.get_upper_display_names(use_alias=True)["111"], "DAGENS NYHETER")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for attachment saving and main-thread dispatch in the Gmail downloader
+"""
+
+import io
+import shutil
+import tempfile
+import threading
+import tkinter as tk
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src to path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.gmail.downloader import DownloadManager, GmailDownloader
+
+
+class TestDownloadManagerSave(unittest.TestCase):
+    """Test streaming saves, .part handling and exclusive filename claims"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = DownloadManager(self.temp_dir)
+        self.output_path = self.manager.output_path
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _leftover_parts(self):
+        return list(self.output_path.glob("*.part"))
+
+    def test_save_attachment_writes_file(self):
+        """A successful save lands under the final name and leaves no .part file"""
+        size = self.manager.save_attachment("page.jpg", lambda f: f.write(b"jpegdata"))
+
+        self.assertEqual(size, 8)
+        self.assertEqual((self.output_path / "page.jpg").read_bytes(), b"jpegdata")
+        self.assertEqual(self._leftover_parts(), [])
+        self.assertTrue(self.manager.check_duplicate_in_session("page.jpg"))
+
+    def test_failed_write_keeps_existing_file(self):
+        """A cancelled or failing download never clobbers an existing file"""
+        target = self.output_path / "page.jpg"
+        target.write_bytes(b"original")
+
+        def failing_write(f):
+            f.write(b"partial")
+            raise OSError("connection lost")
+
+        self.assertIsNone(self.manager.save_attachment("page.jpg", lambda f: None))
+        self.assertIsNone(self.manager.save_attachment("page.jpg", failing_write))
+
+        self.assertEqual(target.read_bytes(), b"original")
+        self.assertEqual(self._leftover_parts(), [])
+        self.assertFalse(self.manager.check_duplicate_in_session("page.jpg"))
+
+    def test_size_hint_is_truncated_to_written_size(self):
+        """A preallocated file is cut back when fewer bytes arrive than expected"""
+        size = self.manager.save_attachment("page.jpg", lambda f: f.write(b"abc"), size_hint=1000)
+
+        self.assertEqual(size, 3)
+        self.assertEqual((self.output_path / "page.jpg").read_bytes(), b"abc")
+
+    def test_create_exclusive_claims_only_new_names(self):
+        """create_exclusive returns a descriptor for new files and None for existing ones"""
+        (self.output_path / "taken.jpg").write_bytes(b"x")
+        self.assertIsNone(self.manager.create_exclusive("taken.jpg"))
+
+        fd = self.manager.create_exclusive("new.jpg")
+        self.assertIsNotNone(fd)
+        # A second claim of the same name fails while the first is still being written
+        self.assertIsNone(self.manager.create_exclusive("new.jpg"))
+
+        size = self.manager.save_attachment("new.jpg", lambda f: f.write(b"data"), fd=fd)
+        self.assertEqual(size, 4)
+        self.assertEqual((self.output_path / "new.jpg").read_bytes(), b"data")
+        self.assertEqual(self._leftover_parts(), [])
+
+    def test_failed_write_removes_claimed_file(self):
+        """A file created by create_exclusive is removed again if the download fails"""
+        fd = self.manager.create_exclusive("new.jpg")
+
+        self.assertIsNone(self.manager.save_attachment("new.jpg", lambda f: None, fd=fd))
+        self.assertFalse((self.output_path / "new.jpg").exists())
+
+    def test_save_file_accepts_bytes_and_streams(self):
+        """save_file writes both bytes and file-like objects"""
+        self.assertTrue(self.manager.save_file("a.jpg", b"bytes-data"))
+        self.assertTrue(self.manager.save_file("b.jpg", io.BytesIO(b"stream-data")))
+
+        self.assertEqual((self.output_path / "a.jpg").read_bytes(), b"bytes-data")
+        self.assertEqual((self.output_path / "b.jpg").read_bytes(), b"stream-data")
+
+
+class _FakeRoot:
+    """Stand-in for a Tk root: after() either runs callbacks on a thread or drops them"""
+
+    def __init__(self, run_callbacks=True, exists=True, after_error=None):
+        self.run_callbacks = run_callbacks
+        self.exists = exists
+        self.after_error = after_error
+
+    def after(self, _ms, func):
+        if self.after_error:
+            raise self.after_error
+        if self.run_callbacks:
+            threading.Thread(target=func).start()
+
+    def winfo_exists(self):
+        return self.exists
+
+
+class TestRunOnMainThread(unittest.TestCase):
+    """Test that workers waiting on the main thread can always give up"""
+
+    def setUp(self):
+        self.downloader = GmailDownloader()
+        self.downloader.cancel_event = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def _call_from_worker(self, func, *args):
+        future = self.executor.submit(self.downloader._run_on_main_thread, func, *args,
+                                      fallback="SKIP")
+        return future.result(timeout=5)
+
+    def test_returns_result_of_callback(self):
+        self.downloader.root = _FakeRoot()
+        self.assertEqual(self._call_from_worker(lambda x: x * 2, 21), 42)
+
+    def test_reraises_callback_error(self):
+        self.downloader.root = _FakeRoot()
+
+        def fail():
+            raise ValueError("dialog failed")
+
+        with self.assertRaises(ValueError):
+            self._call_from_worker(fail)
+
+    def test_cancel_returns_fallback(self):
+        """A callback that never runs does not block a cancelled worker"""
+        self.downloader.root = _FakeRoot(run_callbacks=False)
+        self.downloader.cancel_event.set()
+        self.assertEqual(self._call_from_worker(lambda: "overwrite"), "SKIP")
+
+    def test_destroyed_root_returns_fallback(self):
+        self.downloader.root = _FakeRoot(run_callbacks=False, exists=False)
+        self.assertEqual(self._call_from_worker(lambda: "overwrite"), "SKIP")
+
+    def test_after_error_returns_fallback(self):
+        self.downloader.root = _FakeRoot(after_error=tk.TclError("application has been destroyed"))
+        self.assertEqual(self._call_from_worker(lambda: "overwrite"), "SKIP")
+
+
+class TestProgressThrottle(unittest.TestCase):
+    """Test the shared progress throttle of the download workers"""
+
+    def test_tick_throttles_unless_forced_or_complete(self):
+        downloader = GmailDownloader()
+        calls = []
+
+        def record(message, progress):
+            calls.append((message, progress))
+
+        downloader._tick("first", 10, record)
+        downloader._tick("throttled", 20, record)
+        downloader._tick("forced", 30, record, force=True)
+        downloader._tick("done", 100, record)
+
+        self.assertEqual([message for message, _ in calls], ["first", "forced", "done"])
+
+
+if __name__ == '__main__':
+    unittest.main()
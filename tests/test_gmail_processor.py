@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for Gmail attachment decoding and MIME part extraction
+"""
+
+import base64
+import io
+import os
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.gmail import processor as gmail_processor
+from src.gmail.processor import AttachmentProcessor, _to_standard_b64
+
+
+class _FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class _FakeGmailService:
+    """Minimal stand-in for the users().messages().attachments().get() call chain"""
+
+    def __init__(self, attachment_data):
+        self.attachment_data = attachment_data
+        self.requests = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def attachments(self):
+        return self
+
+    def get(self, **kwargs):
+        self.requests.append(kwargs)
+        return _FakeRequest({'data': self.attachment_data})
+
+
+def _gmail_b64(data: bytes) -> str:
+    """Encode like the Gmail API: URL-safe alphabet without padding"""
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+class TestBase64Translation(unittest.TestCase):
+    """Test conversion of Gmail's URL-safe base64 to padded standard base64"""
+
+    def test_alphabet_and_padding(self):
+        for length in range(0, 10):
+            data = bytes(range(250, 250 - length, -1))
+            with self.subTest(length=length):
+                encoded = _to_standard_b64(_gmail_b64(data))
+                self.assertEqual(len(encoded) % 4, 0)
+                self.assertEqual(base64.b64decode(encoded), data)
+
+    def test_url_safe_characters_are_translated(self):
+        self.assertEqual(_to_standard_b64("-_-_"), b"+/+/")
+
+
+class TestDownloadAttachmentTo(unittest.TestCase):
+    """Test window-by-window decoding of downloaded attachments"""
+
+    def test_multi_window_attachment_is_decoded_exactly(self):
+        # Spans several decode windows and ends mid-quantum (needs padding)
+        data = os.urandom(gmail_processor._DECODE_WINDOW * 2 + 7)
+        service = _FakeGmailService(_gmail_b64(data))
+        dest = io.BytesIO()
+
+        written = AttachmentProcessor(service).download_attachment_to(dest, "msg1", "att1")
+
+        self.assertEqual(written, len(data))
+        self.assertEqual(dest.getvalue(), data)
+        self.assertEqual(service.requests[0]['fields'], gmail_processor.ATTACHMENT_FIELDS)
+
+    def test_small_attachment_is_decoded(self):
+        data = b"\xff\xd8\xff\xe0 small jpeg \xff\xd9"
+        service = _FakeGmailService(_gmail_b64(data))
+        dest = io.BytesIO()
+
+        written = AttachmentProcessor(service).download_attachment_to(dest, "msg1", "att1")
+
+        self.assertEqual(written, len(data))
+        self.assertEqual(dest.getvalue(), data)
+
+    def test_cancelled_before_request(self):
+        service = _FakeGmailService(_gmail_b64(b"data"))
+        dest = io.BytesIO()
+
+        result = AttachmentProcessor(service).download_attachment_to(
+            dest, "msg1", "att1", cancel_check=lambda: True)
+
+        self.assertIsNone(result)
+        self.assertEqual(service.requests, [])
+        self.assertEqual(dest.getvalue(), b"")
+
+
+class TestExtractAttachments(unittest.TestCase):
+    """Test the iterative walk over nested MIME parts"""
+
+    def test_nested_parts_in_document_order(self):
+        payload = {
+            'filename': '',
+            'parts': [
+                {'filename': 'first.JPG', 'body': {'attachmentId': 'a1', 'size': 10}},
+                {'filename': '', 'parts': [
+                    {'filename': 'second.jpeg', 'body': {'attachmentId': 'a2', 'size': 20}},
+                    {'filename': '', 'parts': [
+                        {'filename': 'third.jPg', 'body': {'attachmentId': 'a3'}},
+                    ]},
+                ]},
+                {'filename': 'fourth.jpg', 'body': {'attachmentId': 'a4', 'size': 40}},
+            ],
+        }
+
+        attachments = AttachmentProcessor(None).extract_attachments(payload)
+
+        self.assertEqual(attachments, [
+            ('first.JPG', 'a1', 10),
+            ('second.jpeg', 'a2', 20),
+            ('third.jPg', 'a3', 0),
+            ('fourth.jpg', 'a4', 40),
+        ])
+
+    def test_non_jpg_and_inline_parts_are_ignored(self):
+        payload = {
+            'filename': '',
+            'parts': [
+                {'filename': 'notes.pdf', 'body': {'attachmentId': 'p1', 'size': 5}},
+                {'filename': 'inline.jpg', 'body': {'size': 5}},  # no attachmentId
+                {'filename': 'photo.jpg.txt', 'body': {'attachmentId': 't1', 'size': 5}},
+            ],
+        }
+
+        self.assertEqual(AttachmentProcessor(None).extract_attachments(payload), [])
+
+    def test_deep_nesting_does_not_recurse(self):
+        payload = {'filename': 'deep.jpg', 'body': {'attachmentId': 'd1', 'size': 1}}
+        for _ in range(5000):
+            payload = {'filename': '', 'parts': [payload]}
+
+        self.assertEqual(AttachmentProcessor(None).extract_attachments(payload),
+                         [('deep.jpg', 'd1', 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
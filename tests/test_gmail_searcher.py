@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for Gmail search query building and sharded date-range searches
+"""
+
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.gmail.downloader import GmailDownloader
+from src.gmail.searcher import GmailSearcher, _build_search_query, shard_date_range
+
+
+class TestShardDateRange(unittest.TestCase):
+    """Test splitting of inclusive date ranges into search windows"""
+
+    def test_range_split_into_weeks(self):
+        windows = shard_date_range("2024-01-01", "2024-01-20", 7)
+        self.assertEqual(windows, [
+            ("2024-01-01", "2024-01-07"),
+            ("2024-01-08", "2024-01-14"),
+            ("2024-01-15", "2024-01-20"),
+        ])
+
+    def test_windows_cover_range_without_gaps(self):
+        """Windows are consecutive across month and leap-year boundaries"""
+        windows = shard_date_range("2024-02-20", "2024-03-10", 7)
+        self.assertEqual(windows[0][0], "2024-02-20")
+        self.assertEqual(windows[-1][1], "2024-03-10")
+        self.assertEqual(windows[0][1], "2024-02-26")
+        self.assertEqual(windows[1][0], "2024-02-27")
+        self.assertEqual(windows[1][1], "2024-03-04")
+
+    def test_single_day_window_has_empty_end(self):
+        """A trailing one-day window uses the single-day query form"""
+        self.assertEqual(shard_date_range("2024-01-01", "2024-01-08", 7),
+                         [("2024-01-01", "2024-01-07"), ("2024-01-08", "")])
+        self.assertEqual(shard_date_range("2024-01-01", "2024-01-01", 7),
+                         [("2024-01-01", "")])
+
+    def test_reversed_range_is_empty(self):
+        self.assertEqual(shard_date_range("2024-01-10", "2024-01-01", 7), [])
+
+
+class TestBuildSearchQuery(unittest.TestCase):
+    """Test Gmail query strings for the supported date forms"""
+
+    def test_date_range_includes_end_date(self):
+        query = _build_search_query("noreply@kb.se", "2024-01-01", "2024-01-31", True)
+        self.assertEqual(query, "from:noreply@kb.se after:2024-01-01 before:2024-02-01 has:attachment")
+
+    def test_single_day(self):
+        self.assertEqual(_build_search_query("", "2024-12-31", "", False),
+                         "after:2024-12-31 before:2025-01-01")
+
+    def test_invalid_end_date_raises(self):
+        with self.assertRaises(ValueError):
+            _build_search_query("", "2024-01-01", "2024-13-01", True)
+
+    def test_searcher_method_uses_helper(self):
+        searcher = GmailSearcher(gmail_service=None)
+        self.assertEqual(searcher.build_search_query("a@b.se", "2024-01-01", "2024-01-02"),
+                         _build_search_query("a@b.se", "2024-01-01", "2024-01-02", True))
+
+
+class _FakeSearcher(GmailSearcher):
+    """Searcher returning canned message IDs per query instead of calling Gmail"""
+
+    def __init__(self, results):
+        super().__init__(gmail_service=None)
+        self.results = results
+        self.queries = []
+
+    def search_emails(self, query, progress_callback=None, gui_update_callback=None, cancel_check=None):
+        self.queries.append(query)
+        return list(self.results.get(query, []))
+
+
+class TestShardedSearch(unittest.TestCase):
+    """Test that sharded sub-queries are merged in order without duplicates"""
+
+    def test_sub_queries_are_merged_in_window_order(self):
+        week1 = _build_search_query("kb", "2024-01-01", "2024-01-07", True)
+        week2 = _build_search_query("kb", "2024-01-08", "2024-01-14", True)
+        fake = _FakeSearcher({week1: ["m1", "m2"], week2: ["m2", "m3"]})
+
+        downloader = GmailDownloader()
+        downloader.searcher = fake
+        downloader._get_searcher = lambda: fake
+
+        message_ids = downloader._search_message_ids("kb", "2024-01-01", "2024-01-14")
+
+        self.assertEqual(message_ids, ["m1", "m2", "m3"])
+        self.assertCountEqual(fake.queries, [week1, week2])
+
+    def test_short_range_uses_single_query(self):
+        query = _build_search_query("kb", "2024-01-01", "2024-01-03", True)
+        fake = _FakeSearcher({query: ["m1"]})
+
+        downloader = GmailDownloader()
+        downloader.searcher = fake
+
+        self.assertEqual(downloader._search_message_ids("kb", "2024-01-01", "2024-01-03"), ["m1"])
+        self.assertEqual(fake.queries, [query])
+
+
+if __name__ == '__main__':
+    unittest.main()
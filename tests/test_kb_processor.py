@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for KB file grouping, linking and original-file handling
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.kb.processor import (IMAGE_PROCESSING_AVAILABLE, KBProcessor, _KB_STEM_RE,
+                              _link_or_copy, _parse_page_size)
+
+if IMAGE_PROCESSING_AVAILABLE:
+    from PIL import Image
+
+
+class TestStemPattern(unittest.TestCase):
+    """Test splitting of KB filenames into bib code, date and page groups"""
+
+    def test_groups(self):
+        match = _KB_STEM_RE.match("bib13991089_20240101_0_1_x")
+        self.assertEqual(match.groups(), ("bib13991089", "20240101", "0_1_x"))
+
+    def test_too_few_parts_do_not_match(self):
+        self.assertIsNone(_KB_STEM_RE.match("bad_name"))
+
+
+class TestParsePageSize(unittest.TestCase):
+    """Test parsing of the pdf_max_page_size setting"""
+
+    def test_valid_values(self):
+        self.assertEqual(_parse_page_size([2000, 3000]), (2000, 3000))
+        self.assertEqual(_parse_page_size(("20", "30")), (20, 30))
+
+    def test_unset_and_invalid_values(self):
+        for value in (None, [], "bogus", [1, 2, 3], [0, 100], [-5, 100]):
+            with self.subTest(value=value):
+                self.assertIsNone(_parse_page_size(value))
+
+
+class TestLinkOrCopy(unittest.TestCase):
+    """Test hard-linking with copy fallback"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.src = self.temp_dir / "src.jpg"
+        self.src.write_bytes(b"image-data")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_link_keeps_source(self):
+        dest = self.temp_dir / "dest.jpg"
+        _link_or_copy(self.src, dest)
+
+        self.assertTrue(self.src.exists())
+        self.assertEqual(dest.read_bytes(), b"image-data")
+
+    def test_existing_dest_falls_back_to_copy(self):
+        dest = self.temp_dir / "dest.jpg"
+        dest.write_bytes(b"old")
+        _link_or_copy(self.src, dest)
+
+        self.assertEqual(dest.read_bytes(), b"image-data")
+        self.assertFalse(os.path.samefile(self.src, dest))
+
+
+@unittest.skipUnless(IMAGE_PROCESSING_AVAILABLE, "PIL not installed")
+class TestProcessFiles(unittest.TestCase):
+    """Test grouping into PDFs and when original files are removed"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.input_dir = self.temp_dir / "in"
+        self.output_dir = self.temp_dir / "out"
+        self.input_dir.mkdir()
+        self.csv_path = self.temp_dir / "titles_bibids_2024.csv"
+        self.csv_path.write_text("Dagens Nyheter,111\nSvenska Dagbladet,222\n", encoding="utf-8")
+
+        for bib in ("111", "222", "999"):
+            for page in range(1, 4):
+                self._make_jpg(f"bib{bib}_20240101_0_{page}_x.jpg")
+        self._make_jpg("bib111_20240102_0_1_x.jpg")
+        # Duplicate download with a numbered suffix ends up in the same PDF
+        self._make_jpg("bib111_20240101_0_9_x (2).jpg")
+        (self.input_dir / "bad_name.jpg").write_bytes(b"not a jpeg")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_jpg(self, name):
+        Image.new("RGB", (40, 60), 128).save(self.input_dir / name, "JPEG")
+
+    def _process(self, **kwargs):
+        return KBProcessor().process_files(self.csv_path, str(self.input_dir),
+                                           str(self.output_dir), **kwargs)
+
+    def _pdf_names(self):
+        return sorted(p.name for p in self.output_dir.glob("*.pdf"))
+
+    def test_files_grouped_per_date_and_newspaper(self):
+        result = self._process()
+
+        self.assertEqual(self._pdf_names(), [
+            "2024-01-01 DAGENS NYHETER (4 sid).pdf",
+            "2024-01-01 OKÄND bib999 (3 sid).pdf",
+            "2024-01-01 SVENSKA DAGBLADET (3 sid).pdf",
+            "2024-01-02 DAGENS NYHETER (1 sid).pdf",
+        ])
+        self.assertEqual(result["created_count"], 4)
+        self.assertEqual(result["unknown_bib_codes"], ["999"])
+
+    def test_originals_deleted_by_default(self):
+        self._process()
+
+        # Only the file that could not be parsed is left behind
+        self.assertEqual([p.name for p in self.input_dir.iterdir()], ["bad_name.jpg"])
+        self.assertFalse((self.output_dir / "Jpg-filer med fina namn").exists())
+
+    def test_keep_originals(self):
+        before = sorted(p.name for p in self.input_dir.iterdir())
+        self._process(keep_originals=True)
+
+        self.assertEqual(sorted(p.name for p in self.input_dir.iterdir()), before)
+        self.assertEqual(len(self._pdf_names()), 4)
+
+    def test_keep_renamed_and_originals(self):
+        before = sorted(p.name for p in self.input_dir.iterdir())
+        self._process(keep_renamed=True, keep_originals=True)
+
+        renamed = sorted(p.name for p in (self.output_dir / "Jpg-filer med fina namn").iterdir())
+        self.assertEqual(len(renamed), 11)
+        self.assertIn("2024-01-01 DAGENS NYHETER bib111 0_1_x.jpg", renamed)
+        self.assertEqual(sorted(p.name for p in self.input_dir.iterdir()), before)
+
+    def test_keep_renamed_moves_originals(self):
+        self._process(keep_renamed=True)
+
+        renamed = list((self.output_dir / "Jpg-filer med fina namn").iterdir())
+        self.assertEqual(len(renamed), 11)
+        self.assertEqual([p.name for p in self.input_dir.iterdir()], ["bad_name.jpg"])
+
+    def test_max_page_size_still_builds_all_pdfs(self):
+        result = self._process(keep_originals=True, max_page_size=[20, 30])
+
+        self.assertEqual(result["created_count"], 4)
+        self.assertEqual(len(self._pdf_names()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()